@@ -1,96 +1,122 @@
 import math
 from board import Board
-
-PIECE_VALUES = {
-    1: 100,   # pawn
-    2: 320,   # knight
-    3: 330,   # bishop
-    4: 500,   # rook
-    5: 900,   # queen
-    6: 20000, # king
-}
-
-def _clone_board(board: Board) -> Board:
-    b = Board()
-    b.squares = board.squares.copy()
-    b.white_king_moved = board.white_king_moved
-    b.black_king_moved = board.black_king_moved
-    b.white_rook_kingside_moved = board.white_rook_kingside_moved
-    b.white_rook_queenside_moved = board.white_rook_queenside_moved
-    b.black_rook_kingside_moved = board.black_rook_kingside_moved
-    b.black_rook_queenside_moved = board.black_rook_queenside_moved
-    b.side_to_move = board.side_to_move
-    b.en_passant_target = board.en_passant_target
-    return b
+from evaluation import PIECE_VALUES
+from models.opening_book import get_book, DEFAULT_BOOK_PATH
+from models.move_ordering import MoveOrderer, DELTA_MARGIN
 
 def _generate_legal_moves(board: Board, color: int):
-    saved_side = board.side_to_move
-    board.side_to_move = color
-    moves = []
-    for r in range(8):
-        for c in range(8):
-            if int(board.squares[r][c]) * color > 0:
-                for mv in board.get_valid_moves(r, c):
-                    moves.append(((r, c), mv))
-    board.side_to_move = saved_side
-    return moves
+    return list(board.generate_legal_moves(color))
 
 def _evaluate(board: Board, bot_color: int) -> int:
-    # Terminal: checkmate or stalemate
-    if not board.has_any_legal_moves(board.side_to_move):
-        if board.is_in_check(board.side_to_move):
-            # side_to_move is checkmated
-            return -PIECE_VALUES[6] if board.side_to_move == bot_color else PIECE_VALUES[6]
-        return 0
+    # Incremental material + piece-square score; terminal positions are
+    # scored by the search, which already knows the legal move list is empty
+    return board.psq_score if bot_color == 1 else -board.psq_score
+
+def _terminal_score(board: Board, bot_color: int) -> int:
+    # No legal moves: checkmate or stalemate
+    if board.is_in_check(board.side_to_move):
+        # side_to_move is checkmated
+        return -PIECE_VALUES[6] if board.side_to_move == bot_color else PIECE_VALUES[6]
+    return 0
 
-    material = 0
-    for r in range(8):
-        for c in range(8):
-            val = int(board.squares[r][c])
-            if val != 0:
-                material += PIECE_VALUES[abs(val)] * (1 if val > 0 else -1)
+def _quiescence(board: Board, alpha: float, beta: float, bot_color: int,
+                orderer: MoveOrderer, ply: int) -> float:
+    # Search captures only until the position is quiet. The side to move may
+    # stand pat on the static score; in check every evasion is searched.
+    side = board.side_to_move
+    maximizing = (side == bot_color)
+    in_check = board.is_in_check(side)
+    moves = list(board.generate_legal_moves(side, captures_only=not in_check))
+
+    if in_check:
+        if not moves:
+            return _terminal_score(board, bot_color)
+        stand_pat = None
+        best_score = -math.inf if maximizing else math.inf
+    else:
+        stand_pat = _evaluate(board, bot_color)
+        if maximizing:
+            if stand_pat >= beta:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+        else:
+            if stand_pat <= alpha:
+                return stand_pat
+            beta = min(beta, stand_pat)
+        best_score = stand_pat
 
-    # score from bot perspective
-    return material if bot_color == 1 else -material
+    mailbox = board.mailbox
+    for move in orderer.order(board, moves, ply):
+        # delta pruning: even winning the victim for free cannot reach the window
+        if stand_pat is not None:
+            gain = orderer.capture_gain(mailbox, move) + DELTA_MARGIN
+            if maximizing and stand_pat + gain <= alpha:
+                continue
+            if not maximizing and stand_pat - gain >= beta:
+                continue
+
+        undo = board.make_move(move[0], move[1])
+        score = _quiescence(board, alpha, beta, bot_color, orderer, ply + 1)
+        board.unmake_move(undo)
+
+        if maximizing:
+            best_score = max(best_score, score)
+            alpha = max(alpha, best_score)
+        else:
+            best_score = min(best_score, score)
+            beta = min(beta, best_score)
+        if beta <= alpha:
+            break
+    return best_score
 
-def _alpha_beta(board: Board, depth: int, alpha: float, beta: float, bot_color: int):
+def _alpha_beta(board: Board, depth: int, alpha: float, beta: float, bot_color: int,
+                orderer: MoveOrderer, ply: int = 0):
     if depth == 0:
-        return _evaluate(board, bot_color), None
+        return _quiescence(board, alpha, beta, bot_color, orderer, ply), None
 
     legal_moves = _generate_legal_moves(board, board.side_to_move)
     if not legal_moves:
-        return _evaluate(board, bot_color), None
+        return _terminal_score(board, bot_color), None
 
     maximizing = (board.side_to_move == bot_color)
 
     best_move = None
     if maximizing:
         best_score = -math.inf
-        for move in legal_moves:
-            child = _clone_board(board)
-            child.move_piece(move[0], move[1])
-            score, _ = _alpha_beta(child, depth - 1, alpha, beta, bot_color)
+        for move in orderer.order(board, legal_moves, ply):
+            undo = board.make_move(move[0], move[1])
+            score, _ = _alpha_beta(board, depth - 1, alpha, beta, bot_color, orderer, ply + 1)
+            board.unmake_move(undo)
             if score > best_score:
                 best_score = score
                 best_move = move
             alpha = max(alpha, best_score)
             if beta <= alpha:
+                orderer.record_cutoff(board, move, depth, ply)
                 break
         return best_score, best_move
     else:
         best_score = math.inf
-        for move in legal_moves:
-            child = _clone_board(board)
-            child.move_piece(move[0], move[1])
-            score, _ = _alpha_beta(child, depth - 1, alpha, beta, bot_color)
+        for move in orderer.order(board, legal_moves, ply):
+            undo = board.make_move(move[0], move[1])
+            score, _ = _alpha_beta(board, depth - 1, alpha, beta, bot_color, orderer, ply + 1)
+            board.unmake_move(undo)
             if score < best_score:
                 best_score = score
                 best_move = move
             beta = min(beta, best_score)
             if beta <= alpha:
+                orderer.record_cutoff(board, move, depth, ply)
                 break
         return best_score, best_move
 
-def choose_move(board: Board, bot_color: int, depth: int = 3):
-    _, move = _alpha_beta(board, depth, -math.inf, math.inf, bot_color)
+def choose_move(board: Board, bot_color: int, depth: int = 3, book_path: str = DEFAULT_BOOK_PATH):
+    # Play from the opening book while the position is in it
+    book = get_book(book_path)
+    if book is not None:
+        move = book.choose_move(board)
+        if move is not None:
+            return move
+    orderer = MoveOrderer(PIECE_VALUES)
+    _, move = _alpha_beta(board, depth, -math.inf, math.inf, bot_color, orderer)
     return move
\ No newline at end of file
@@ -1,5 +1,7 @@
 import math
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 import sys
 import os
 
@@ -8,7 +10,70 @@ SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src')
 if SRC_DIR not in sys.path:
     sys.path.insert(0, SRC_DIR)
 
+import numpy as np
+
 from board import Board
+from bitboard import KING_ATTACKS, iter_bits
+from evaluation import PIECE_VALUES
+from models.transposition import TranspositionTable, EXACT, LOWER, UPPER
+from models.move_ordering import MoveOrderer, DELTA_MARGIN, MAX_PLY
+from models.opening_book import get_book, DEFAULT_BOOK_PATH
+from models.tablebase import get_tablebase, WIN
+
+# Clock-based time management
+MOVES_TO_GO = 30    # assume the game lasts this many more moves
+MIN_MOVE_MS = 50    # never plan less than this for one move
+
+
+def move_time_budget(remaining_seconds: float) -> int:
+    """
+    Milliseconds a bot should spend on its next move.
+
+    Args:
+        remaining_seconds: time left on the bot's clock
+
+    Returns:
+        A per-move budget in milliseconds
+    """
+    return max(MIN_MOVE_MS, int(remaining_seconds * 1000 / MOVES_TO_GO))
+
+
+# One bot per (class, color, settings) in each pool worker, kept between
+# tasks so its transposition table and history survive from one root move
+# to the next
+_worker_bots = {}
+
+
+def _search_root_move(bot_class, color, bot_kwargs, search_id, position, move, depth,
+                      alpha, beta, time_ms):
+    """
+    Search one root move in a pool worker (see AlphaBetaBot workers).
+
+    The worker's bot is built with the calling bot's constructor settings
+    (bot_kwargs), so it keeps the same table size, book and tablebases.
+    The root position arrives as a Board.snapshot() Position, which pickles
+    far smaller than a Board.
+
+    Returns:
+        Tuple of (score, stopped, node_counts) where node_counts starts at ply 0
+    """
+    bot_key = (bot_class, color, tuple(sorted(bot_kwargs.items())))
+    bot, last_search = _worker_bots.get(bot_key, (None, None))
+    if bot is None:
+        bot = bot_class(color=color, **bot_kwargs)
+    if last_search != search_id:
+        bot.tt.new_search()
+        bot.orderer.new_search()
+    _worker_bots[bot_key] = (bot, search_id)
+
+    bot._stopped = False
+    bot._nodes = 0
+    bot._deadline = None if time_ms is None else time.perf_counter() + time_ms / 1000
+    bot.node_counts = [0]  # the root belongs to the calling process
+    board = Board.from_snapshot(position)
+    board.make_move(move[0], move[1])
+    score, _ = bot._alpha_beta(board, depth, alpha, beta, 1)
+    return score, bot._stopped, bot.node_counts
 
 
 class Bot(ABC):
@@ -38,63 +103,233 @@ class Bot(ABC):
         """
         pass
 
+    def stop(self):
+        """Ask a get_move running on another thread to return early (no-op by default)."""
+        pass
+
+    def clear_stop(self):
+        """Forget an earlier stop() before a new search starts (no-op by default)."""
+        pass
+
 
 class AlphaBetaBot(Bot):
     """Bot using alpha-beta pruning algorithm"""
     
-    PIECE_VALUES = {
-        1: 100,   # pawn
-        2: 320,   # knight
-        3: 330,   # bishop
-        4: 500,   # rook
-        5: 900,   # queen
-        6: 20000, # king
-    }
+    PIECE_VALUES = PIECE_VALUES
+    DELTA_MARGIN = DELTA_MARGIN
+    # Being mated at ply p scores -(MATE_SCORE - p), so shorter mates score
+    # higher; anything beyond MATE_BOUND is a mate
+    MATE_SCORE = PIECE_VALUES[6]
+    MATE_BOUND = MATE_SCORE - MAX_PLY
+    # Tablebase win: above any material balance, below a mate score
+    TABLEBASE_WIN = PIECE_VALUES[6] // 2
     
-    def __init__(self, color: int, depth: int = 3):
+    def __init__(self, color: int, depth: int = 3, tt_size_mb: float = 16,
+                 move_time_ms: int = None, workers: int = 1,
+                 book_path: str = DEFAULT_BOOK_PATH, tablebase_path: str = None):
         """
         Initialize alpha-beta pruning bot.
         
         Args:
             color: 1 for white, -1 for black
-            depth: search depth (default 3)
+            depth: maximum search depth (default 3)
+            tt_size_mb: memory budget of the transposition table in megabytes
+            move_time_ms: time budget per move; None searches to full depth
+            workers: processes searching root moves in parallel; 1 searches
+                everything in this process
+            book_path: Polyglot opening book to play from before searching;
+                None (or a missing file) disables the book
+            tablebase_path: directory of Syzygy tables probed at the root
+                and in the search; None disables probing
         """
         super().__init__(color, depth)
+        self.book = get_book(book_path)
+        self.tablebase = get_tablebase(tablebase_path)
+        # settings the bots in the worker processes are built with
+        self._worker_kwargs = {'tt_size_mb': tt_size_mb, 'book_path': book_path,
+                               'tablebase_path': tablebase_path}
+        self.workers = workers
+        self._pool = None
+        self._search_id = 0
+        self.tt = TranspositionTable(tt_size_mb)
+        self.orderer = MoveOrderer(self.PIECE_VALUES)
+        self.move_time_ms = move_time_ms
+        self._deadline = None
+        self._stopped = False
+        self._nodes = 0
+        # deepest iteration completed by the last get_move call
+        self.completed_depth = 0
+        # nodes visited per ply from the root during the last get_move call
+        self.node_counts = []
     
     def get_move(self, board: Board):
-        _, move = self._alpha_beta(board, self.depth, -math.inf, math.inf)
-        return move
-    
-    def _clone_board(self, board: Board) -> Board:
-        """Create a deep copy of the board state"""
-        b = Board()
-        b.squares = board.squares.copy()
-        b.white_king_moved = board.white_king_moved
-        b.black_king_moved = board.black_king_moved
-        b.white_rook_kingside_moved = board.white_rook_kingside_moved
-        b.white_rook_queenside_moved = board.white_rook_queenside_moved
-        b.black_rook_kingside_moved = board.black_rook_kingside_moved
-        b.black_rook_queenside_moved = board.black_rook_queenside_moved
-        b.side_to_move = board.side_to_move
-        b.en_passant_target = board.en_passant_target
-        return b
+        """
+        Search with iterative deepening, one ply deeper per iteration.
+
+        Stops when `depth` is reached or move_time_ms runs out, and returns
+        the best move of the last completed iteration. The first iteration
+        always completes so a move is returned even on a tiny budget.
+        Positions in the opening book are answered from the book, and
+        endgames in the tablebases from the tables, instead.
+
+        A stop() that arrives before the search starts is kept, so the
+        search returns at once; see clear_stop.
+        """
+        try:
+            return self._iterative_deepening(board)
+        finally:
+            # the stop was meant for this search, not the next one
+            self._stopped = False
+
+    def _iterative_deepening(self, board: Board):
+        self.tt.new_search()
+        self.orderer.new_search()
+        self._deadline = None
+        self._nodes = 0
+        self.completed_depth = 0
+        self.node_counts = []
+        start = time.perf_counter()
+
+        if self.book is not None:
+            move = self.book.choose_move(board)
+            if move is not None:
+                return move
+        if self.tablebase is not None:
+            move = self.tablebase.best_move(board)
+            if move is not None:
+                return move
+
+        self._search_id += 1
+
+        best_move = None
+        for depth in range(1, self.depth + 1):
+            if self.workers > 1:
+                score, move = self._parallel_root(board, depth)
+            else:
+                score, move = self._alpha_beta(board, depth, -math.inf, math.inf)
+            if self._stopped:
+                break
+            best_move = move
+            self.completed_depth = depth
+            if abs(score) >= self.MATE_BOUND or move is None:
+                break  # forced mate found or no legal moves
+            if self.move_time_ms is not None:
+                self._deadline = start + self.move_time_ms / 1000
+                if time.perf_counter() >= self._deadline:
+                    break
+        return best_move
     
+    def stop(self):
+        """
+        Abort the running search from another thread.
+
+        get_move then returns the best move of its last completed
+        iteration, or None if the first iteration was cut short.
+        """
+        self._stopped = True
+
+    def clear_stop(self):
+        """
+        Forget a stop() left over from an earlier search.
+
+        Call before handing the bot to the thread that runs get_move, so a
+        stop() made in between is not lost.
+        """
+        self._stopped = False
+
+    def close(self):
+        """Shut down the worker processes of a parallel bot."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def _parallel_root(self, board: Board, depth: int):
+        """
+        Root-splitting search over the worker pool.
+
+        The first root move (the hash move once there is one) is searched
+        here to get a bound; the remaining moves go to the workers, each
+        searched with the best score known when it is handed out. Workers
+        keep their own transposition tables, so no state is shared between
+        processes. Returns the same (best_score, best_move) as _alpha_beta.
+        """
+        moves = self._generate_legal_moves(board, board.side_to_move)
+        if depth == 1 or len(moves) < 2:
+            return self._alpha_beta(board, depth, -math.inf, math.inf)
+
+        if self.node_counts:
+            self.node_counts[0] += 1
+        else:
+            self.node_counts.append(1)
+
+        key = board.zobrist_key
+        entry = self.tt.probe(key)
+        moves = self.orderer.order(board, moves, 0, entry.move if entry is not None else None)
+        maximizing = (board.side_to_move == self.color)
+
+        undo = board.make_move(moves[0][0], moves[0][1])
+        best_score, _ = self._alpha_beta(board, depth - 1, -math.inf, math.inf, 1)
+        board.unmake_move(undo)
+        if self._stopped:
+            return best_score, None
+        best_index = 0
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        pending = {}
+        next_index = 1
+        position = board.snapshot()
+        while pending or next_index < len(moves):
+            while next_index < len(moves) and len(pending) < self.workers:
+                alpha, beta = (best_score, math.inf) if maximizing else (-math.inf, best_score)
+                time_ms = None
+                if self._deadline is not None:
+                    time_ms = max(0.0, (self._deadline - time.perf_counter()) * 1000)
+                future = self._pool.submit(
+                    _search_root_move, type(self), self.color, self._worker_kwargs, self._search_id,
+                    position, moves[next_index], depth - 1, alpha, beta, time_ms,
+                )
+                pending[future] = next_index
+                next_index += 1
+
+            done, _ = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                self._stopped = True
+            for future in done:
+                index = pending.pop(future)
+                score, stopped, counts = future.result()
+                self._stopped |= stopped
+                for ply, count in enumerate(counts):
+                    if ply < len(self.node_counts):
+                        self.node_counts[ply] += count
+                    else:
+                        self.node_counts.append(count)
+                # a tie only counts for a move listed earlier, as in the serial search
+                if score == best_score and index < best_index:
+                    best_index = index
+                elif score > best_score if maximizing else score < best_score:
+                    best_score, best_index = score, index
+            if self._stopped:
+                for future in pending:
+                    future.cancel()
+                return best_score, None
+
+        best_move = moves[best_index]
+        self.tt.store(key, depth, EXACT, best_score, best_move)
+        return best_score, best_move
+
     def _generate_legal_moves(self, board: Board, color: int):
         """Generate all legal moves for a given color"""
-        saved_side = board.side_to_move
-        board.side_to_move = color
-        moves = []
-        for r in range(8):
-            for c in range(8):
-                if int(board.squares[r][c]) * color > 0:
-                    for mv in board.get_valid_moves(r, c):
-                        moves.append(((r, c), mv))
-        board.side_to_move = saved_side
-        return moves
+        return list(board.generate_legal_moves(color))
     
     def _evaluate(self, board: Board) -> int:
         """
         Evaluate the board position from this bot's perspective.
+
+        Reads the material and piece-square score the board keeps up to
+        date as pieces move. Checkmate and stalemate are not detected here;
+        the search scores them with _terminal_score once it has found that
+        the legal move list is empty.
         
         Args:
             board: The board state to evaluate
@@ -102,24 +337,34 @@ class AlphaBetaBot(Bot):
         Returns:
             A score (positive favors this bot, negative favors opponent)
         """
-        # Terminal: checkmate or stalemate
-        if not board.has_any_legal_moves(board.side_to_move):
-            if board.is_in_check(board.side_to_move):
-                # side_to_move is checkmated
-                return -self.PIECE_VALUES[6] if board.side_to_move == self.color else self.PIECE_VALUES[6]
-            return 0
+        # score from bot perspective
+        return board.psq_score if self.color == 1 else -board.psq_score
 
-        material = 0
-        for r in range(8):
-            for c in range(8):
-                val = int(board.squares[r][c])
-                if val != 0:
-                    material += self.PIECE_VALUES[abs(val)] * (1 if val > 0 else -1)
+    def _terminal_score(self, board: Board, ply: int) -> int:
+        """Score of a position `ply` plies from the root where the side to move has no legal moves."""
+        if board.is_in_check(board.side_to_move):
+            # side_to_move is checkmated
+            score = self.MATE_SCORE - ply
+            return -score if board.side_to_move == self.color else score
+        return 0
 
-        # score from bot perspective
-        return material if self.color == 1 else -material
+    def _score_to_tt(self, score, ply: int):
+        """Mate scores are stored counted from the node, not from the root."""
+        if score >= self.MATE_BOUND:
+            return score + ply
+        if score <= -self.MATE_BOUND:
+            return score - ply
+        return score
+
+    def _score_from_tt(self, score, ply: int):
+        """Inverse of _score_to_tt for a node `ply` plies from the root."""
+        if score >= self.MATE_BOUND:
+            return score - ply
+        if score <= -self.MATE_BOUND:
+            return score + ply
+        return score
     
-    def _alpha_beta(self, board: Board, depth: int, alpha: float, beta: float):
+    def _alpha_beta(self, board: Board, depth: int, alpha: float, beta: float, ply: int = 0):
         """
         Alpha-beta pruning algorithm.
         
@@ -128,46 +373,174 @@ class AlphaBetaBot(Bot):
             depth: Remaining depth to search
             alpha: Best score found for maximizer
             beta: Best score found for minimizer
+            ply: Distance from the root
             
         Returns:
             Tuple of (best_score, best_move)
         """
+        if ply < len(self.node_counts):
+            self.node_counts[ply] += 1
+        else:
+            self.node_counts.append(1)
+
+        # Check the clock every 1024 nodes
+        self._nodes += 1
+        if self._deadline is not None and not self._nodes & 1023:
+            if time.perf_counter() >= self._deadline:
+                self._stopped = True
+        if self._stopped:
+            return 0, None
+
+        if ply > 0 and self.tablebase is not None:
+            wdl = self.tablebase.probe_wdl(board)
+            if wdl is not None:
+                score = self.TABLEBASE_WIN if wdl == WIN else -self.TABLEBASE_WIN if wdl == -WIN else 0
+                return (score if board.side_to_move == self.color else -score), None
+
         if depth == 0:
-            return self._evaluate(board), None
+            return self._quiescence(board, alpha, beta, ply), None
+
+        key = board.zobrist_key
+        entry = self.tt.probe(key)
+        hash_move = None
+        if entry is not None:
+            hash_move = entry.move
+            if entry.depth >= depth:
+                score = self._score_from_tt(entry.score, ply)
+                if entry.bound == EXACT:
+                    return score, entry.move
+                if entry.bound == LOWER and score >= beta:
+                    return score, entry.move
+                if entry.bound == UPPER and score <= alpha:
+                    return score, entry.move
 
         legal_moves = self._generate_legal_moves(board, board.side_to_move)
         if not legal_moves:
-            return self._evaluate(board), None
+            score = self._terminal_score(board, ply)
+            self.tt.store(key, depth, EXACT, self._score_to_tt(score, ply), None)
+            return score, None
+
+        legal_moves = self.orderer.order(board, legal_moves, ply, hash_move)
 
+        alpha_orig, beta_orig = alpha, beta
         maximizing = (board.side_to_move == self.color)
 
         best_move = None
         if maximizing:
             best_score = -math.inf
             for move in legal_moves:
-                child = self._clone_board(board)
-                child.move_piece(move[0], move[1])
-                score, _ = self._alpha_beta(child, depth - 1, alpha, beta)
+                undo = board.make_move(move[0], move[1])
+                score, _ = self._alpha_beta(board, depth - 1, alpha, beta, ply + 1)
+                board.unmake_move(undo)
+                if self._stopped:
+                    return best_score, best_move
                 if score > best_score:
                     best_score = score
                     best_move = move
                 alpha = max(alpha, best_score)
                 if beta <= alpha:
+                    self.orderer.record_cutoff(board, move, depth, ply)
                     break
-            return best_score, best_move
         else:
             best_score = math.inf
             for move in legal_moves:
-                child = self._clone_board(board)
-                child.move_piece(move[0], move[1])
-                score, _ = self._alpha_beta(child, depth - 1, alpha, beta)
+                undo = board.make_move(move[0], move[1])
+                score, _ = self._alpha_beta(board, depth - 1, alpha, beta, ply + 1)
+                board.unmake_move(undo)
+                if self._stopped:
+                    return best_score, best_move
                 if score < best_score:
                     best_score = score
                     best_move = move
                 beta = min(beta, best_score)
                 if beta <= alpha:
+                    self.orderer.record_cutoff(board, move, depth, ply)
                     break
-            return best_score, best_move
+
+        if best_score <= alpha_orig:
+            bound = UPPER
+        elif best_score >= beta_orig:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.tt.store(key, depth, bound, self._score_to_tt(best_score, ply), best_move)
+        return best_score, best_move
+
+    def _quiescence(self, board: Board, alpha: float, beta: float, ply: int) -> float:
+        """
+        Capture-only search below the horizon so leaves are never scored
+        in the middle of an exchange.
+
+        The side to move may "stand pat" on the static evaluation instead of
+        capturing. Captures that could not lift the score past the window
+        even if the victim were won for free are skipped (delta pruning).
+        When in check, every evasion is searched and standing pat is not
+        allowed. Stalemates are only recognised in the main search.
+
+        Returns:
+            The score of the position from this bot's perspective
+        """
+        if ply < len(self.node_counts):
+            self.node_counts[ply] += 1
+        else:
+            self.node_counts.append(1)
+
+        self._nodes += 1
+        if self._deadline is not None and not self._nodes & 1023:
+            if time.perf_counter() >= self._deadline:
+                self._stopped = True
+        if self._stopped:
+            return 0
+
+        side = board.side_to_move
+        maximizing = (side == self.color)
+        in_check = board.is_in_check(side)
+        moves = list(board.generate_legal_moves(side, captures_only=not in_check))
+
+        if in_check:
+            if not moves:
+                return self._terminal_score(board, ply)
+            best_score = -math.inf if maximizing else math.inf
+            stand_pat = None
+        else:
+            stand_pat = self._evaluate(board)
+            if maximizing:
+                if stand_pat >= beta:
+                    return stand_pat
+                alpha = max(alpha, stand_pat)
+            else:
+                if stand_pat <= alpha:
+                    return stand_pat
+                beta = min(beta, stand_pat)
+            best_score = stand_pat
+
+        mailbox = board.mailbox
+        for move in self.orderer.order(board, moves, ply):
+            if stand_pat is not None:
+                gain = self.orderer.capture_gain(mailbox, move) + self.DELTA_MARGIN
+                if maximizing and stand_pat + gain <= alpha:
+                    continue
+                if not maximizing and stand_pat - gain >= beta:
+                    continue
+
+            undo = board.make_move(move[0], move[1])
+            score = self._quiescence(board, alpha, beta, ply + 1)
+            board.unmake_move(undo)
+            if self._stopped:
+                return best_score
+
+            if maximizing:
+                if score > best_score:
+                    best_score = score
+                alpha = max(alpha, best_score)
+            else:
+                if score < best_score:
+                    best_score = score
+                beta = min(beta, best_score)
+            if beta <= alpha:
+                break
+
+        return best_score
 
 
 class RandomBot(Bot):
@@ -179,13 +552,7 @@ class RandomBot(Bot):
         return random.choice(legal_moves) if legal_moves else None
     
     def _get_legal_moves(self, board: Board):
-        moves = []
-        for r in range(8):
-            for c in range(8):
-                if int(board.squares[r][c]) * self.color > 0:
-                    for mv in board.get_valid_moves(r, c):
-                        moves.append(((r, c), mv))
-        return moves
+        return list(board.generate_legal_moves(self.color))
 
 
 class CautiousBot(AlphaBetaBot):
@@ -199,10 +566,15 @@ class CautiousBot(AlphaBetaBot):
         return base_eval + king_safety * 10
     
     def _evaluate_king_safety(self, board: Board) -> int:
-        # Evaluate how safe each king is
+        # Attacks on the squares around each king
         # Positive = good for this bot
         score = 0
-        # ... implement king safety logic ...
+        for color, sign in ((self.color, -1), (-self.color, 1)):
+            king_sq = board.king_square(color)
+            if king_sq is None:
+                continue
+            zone = list(iter_bits(KING_ATTACKS[king_sq]))
+            score += sign * int(board.attack_map(-color).ravel()[zone].sum())
         return score
 
 
@@ -218,8 +590,8 @@ class AggressiveBot(AlphaBetaBot):
     
     def _count_attacked_pieces(self, board: Board) -> int:
         # Count opponent pieces under attack
-        # ... implement attack counting logic ...
-        return 0        
+        theirs = board.squares * self.color < 0
+        return int(np.count_nonzero(theirs & (board.attack_map(self.color) > 0)))
     
 class TacticalBot(AlphaBetaBot):
     """Bot that recognizes basic tactical patterns"""
@@ -231,16 +603,15 @@ class TacticalBot(AlphaBetaBot):
             return winning_move
         
         # Then use normal alpha-beta
-        _, move = self._alpha_beta(board, self.depth, -math.inf, math.inf)
-        return move
+        return super().get_move(board)
     
     def _find_checkmate(self, board: Board):
         """Look for immediate checkmate moves"""
         legal_moves = self._generate_legal_moves(board, self.color)
         for move in legal_moves:
-            child = self._clone_board(board)
-            child.move_piece(move[0], move[1])
-            if not child.has_any_legal_moves(-self.color):
-                if child.is_in_check(-self.color):
-                    return move
+            undo = board.make_move(move[0], move[1])
+            mated = not board.has_any_legal_moves(-self.color) and board.is_in_check(-self.color)
+            board.unmake_move(undo)
+            if mated:
+                return move
         return None
\ No newline at end of file
@@ -0,0 +1,102 @@
+from operator import itemgetter
+
+# Score bands, highest searched first
+HASH_MOVE_SCORE = 1000000
+CAPTURE_SCORE = 100000   # plus MVV-LVA, so every capture beats every quiet move
+KILLER_SCORES = (90000, 89000)
+HISTORY_LIMIT = 80000    # history scores stay below the killer band
+
+MAX_PLY = 128
+
+# Safety margin for delta pruning in the quiescence search: a capture is
+# skipped when even capture_gain plus this cannot reach the window
+DELTA_MARGIN = 200
+
+
+class MoveOrderer:
+    """
+    Orders moves between generation and search.
+
+    Order: the hash move, then captures and promotions by MVV-LVA (most
+    valuable victim first, least valuable attacker breaking ties), then
+    the two killer moves of the ply, then quiet moves by history score.
+    Killers and history are learned from beta cutoffs on quiet moves.
+    """
+
+    def __init__(self, piece_values: dict):
+        """
+        Initialize the orderer.
+
+        Args:
+            piece_values: piece type -> value, used for MVV-LVA
+        """
+        self.piece_values = piece_values
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = {1: {}, -1: {}}
+
+    def new_search(self):
+        """Forget killers and fade history before searching a new position."""
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        for table in self.history.values():
+            for move in list(table):
+                table[move] //= 2
+                if not table[move]:
+                    del table[move]
+
+    def capture_gain(self, mailbox, move):
+        """Material a capture or promotion wins outright, 0 for quiet moves."""
+        (fr, fc), (tr, tc) = move
+        piece = mailbox[fr * 8 + fc]
+        victim = mailbox[tr * 8 + tc]
+        values = self.piece_values
+        gain = 0
+        if victim != 0:
+            gain = values[abs(victim)]
+        elif (piece == 1 or piece == -1) and fc != tc:
+            gain = values[1]  # en passant
+        if (piece == 1 or piece == -1) and (tr == 0 or tr == 7):
+            gain += values[5] - values[1]  # promotion to queen
+        return gain
+
+    def _tactical_score(self, mailbox, move):
+        """MVV-LVA score for captures and promotions, 0 for quiet moves."""
+        gain = self.capture_gain(mailbox, move)
+        if gain == 0:
+            return 0
+        attacker = mailbox[move[0][0] * 8 + move[0][1]]
+        return CAPTURE_SCORE + gain * 100 - self.piece_values[abs(attacker)] // 10
+
+    def order(self, board, moves, ply: int, hash_move=None):
+        """Return `moves` sorted best-first for the position on `board`."""
+        mailbox = board.mailbox
+        killers = self.killers[ply] if ply < MAX_PLY else (None, None)
+        history = self.history[board.side_to_move]
+        scored = []
+        for move in moves:
+            if move == hash_move:
+                score = HASH_MOVE_SCORE
+            else:
+                score = self._tactical_score(mailbox, move)
+                if score == 0:
+                    if move == killers[0]:
+                        score = KILLER_SCORES[0]
+                    elif move == killers[1]:
+                        score = KILLER_SCORES[1]
+                    else:
+                        score = history.get(move, 0)
+            scored.append((score, move))
+        # stable sort keeps generation order among equal scores
+        scored.sort(key=itemgetter(0), reverse=True)
+        return [move for _, move in scored]
+
+    def record_cutoff(self, board, move, depth: int, ply: int):
+        """Learn from a move that caused a beta cutoff (board is before the move)."""
+        if self._tactical_score(board.mailbox, move):
+            return
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        history = self.history[board.side_to_move]
+        history[move] = min(HISTORY_LIMIT, history.get(move, 0) + depth * depth)
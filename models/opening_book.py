@@ -0,0 +1,156 @@
+import mmap
+import os
+import random
+import struct
+
+from chess.polyglot import POLYGLOT_RANDOM_ARRAY
+
+from bitboard import iter_bits
+
+# Book used by the bots unless they are given another path (or None)
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'book.bin')
+
+# Polyglot entry: key, move, weight, learn (big-endian, 16 bytes)
+ENTRY = struct.Struct('>QHHI')
+
+# Offsets into POLYGLOT_RANDOM_ARRAY
+CASTLING_OFFSET = 768
+EP_OFFSET = 772
+TURN_OFFSET = 780
+
+_books = {}
+
+
+def polyglot_key(board) -> int:
+    """Polyglot hash of a Board position (differs from Board.zobrist_key)."""
+    key = 0
+    mailbox = board.mailbox
+    for sq in iter_bits(board.occupied):
+        piece = mailbox[sq]
+        row, col = divmod(sq, 8)
+        # kinds alternate black/white: black pawn 0, white pawn 1, black knight 2, ...
+        kind = 2 * (abs(piece) - 1) + (1 if piece > 0 else 0)
+        key ^= POLYGLOT_RANDOM_ARRAY[64 * kind + 8 * (7 - row) + col]
+
+    rights = board._castling_rights()
+    for bit in range(4):  # white short, white long, black short, black long
+        if rights & (1 << bit):
+            key ^= POLYGLOT_RANDOM_ARRAY[CASTLING_OFFSET + bit]
+
+    # the en passant file only counts when a pawn could actually capture
+    if board.en_passant_target is not None:
+        ep_row, ep_col = board.en_passant_target
+        pawn = board.side_to_move
+        pawn_row = ep_row + 1 if pawn == 1 else ep_row - 1
+        for col in (ep_col - 1, ep_col + 1):
+            if 0 <= col < 8 and mailbox[pawn_row * 8 + col] == pawn:
+                key ^= POLYGLOT_RANDOM_ARRAY[EP_OFFSET + ep_col]
+                break
+
+    if board.side_to_move == 1:
+        key ^= POLYGLOT_RANDOM_ARRAY[TURN_OFFSET]
+    return key
+
+
+class OpeningBook:
+    """
+    Polyglot (.bin) opening book, memory-mapped and searched in place.
+
+    Entries are sorted by key, so the moves for a position are found by a
+    binary search over the mapped file without reading it into memory.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a book.
+
+        Args:
+            path: path to a Polyglot .bin file
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.num_entries = size // ENTRY.size
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def _first_index(self, key: int) -> int:
+        """Index of the first entry whose key is >= key."""
+        lo, hi = 0, self.num_entries
+        data = self._data
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ENTRY.unpack_from(data, mid * ENTRY.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find_moves(self, board):
+        """
+        Book moves for the position, with their weights.
+
+        Moves that are not legal on `board` (hash collisions) and
+        underpromotions, which Board cannot play, are left out.
+
+        Returns:
+            List of (move, weight) with move as ((from_row, from_col), (to_row, to_col))
+        """
+        key = polyglot_key(board)
+        data = self._data
+        legal = None
+        found = []
+        index = self._first_index(key)
+        while index < self.num_entries:
+            entry_key, raw, weight, _ = ENTRY.unpack_from(data, index * ENTRY.size)
+            if entry_key != key:
+                break
+            index += 1
+            move = self._decode(board, raw)
+            if move is None:
+                continue
+            if legal is None:
+                legal = set(board.generate_legal_moves())
+            if move in legal:
+                found.append((move, weight))
+        return found
+
+    @staticmethod
+    def _decode(board, raw: int):
+        to_col = raw & 7
+        to_row = 7 - ((raw >> 3) & 7)
+        from_col = (raw >> 6) & 7
+        from_row = 7 - ((raw >> 9) & 7)
+        promotion = (raw >> 12) & 7
+        if promotion not in (0, 4):
+            return None  # only queen promotions exist on Board
+        piece = board.mailbox[from_row * 8 + from_col]
+        # Polyglot writes castling as the king taking its own rook
+        if abs(piece) == 6 and from_col == 4 and from_row == to_row and to_col in (0, 7):
+            to_col = 6 if to_col == 7 else 2
+        return (from_row, from_col), (to_row, to_col)
+
+    def choose_move(self, board, rng=random):
+        """Weighted random book move for the position, or None when out of book."""
+        moves = [(move, weight) for move, weight in self.find_moves(board) if weight > 0]
+        if not moves:
+            return None
+        return rng.choices([m for m, _ in moves], weights=[w for _, w in moves])[0]
+
+
+def get_book(path: str = DEFAULT_BOOK_PATH):
+    """
+    The book at `path`, opened once per process and then shared.
+
+    Returns:
+        An OpeningBook, or None when path is None or the file does not exist
+    """
+    if path is None:
+        return None
+    path = os.path.abspath(path)
+    if path not in _books:
+        _books[path] = OpeningBook(path) if os.path.isfile(path) else None
+    return _books[path]
@@ -0,0 +1,144 @@
+import os
+from collections import OrderedDict
+
+from bitboard import popcount
+
+# Probe results kept per Tablebase and kind, least recently used dropped first
+CACHE_SIZE = 65536
+
+# WDL values as returned by Syzygy, from the side to move's point of view
+WIN = 2
+CURSED_WIN = 1   # win that the fifty-move rule turns into a draw
+DRAW = 0
+
+_tablebases = {}
+
+
+class Tablebase:
+    """
+    Syzygy endgame tablebases read through python-chess.
+
+    Positions with at most `max_pieces` pieces and no castling rights can
+    be probed. The search only needs WDL results; DTZ is probed for the
+    root moves alone. Both are cached by Zobrist key so the same positions
+    can be probed over and over cheaply.
+    """
+
+    def __init__(self, directory: str, cache_size: int = CACHE_SIZE):
+        """
+        Open the tables in a directory.
+
+        Args:
+            directory: folder holding Syzygy .rtbw/.rtbz files
+            cache_size: number of results to keep, per kind of probe
+        """
+        import chess.syzygy
+
+        self._tables = chess.syzygy.open_tablebase(directory)
+        # table names look like "KQvKR": one letter per piece
+        names = list(self._tables.wdl) + list(self._tables.dtz)
+        self.max_pieces = max((len(name) - 1 for name in names), default=0)
+        self.cache_size = cache_size
+        self._wdl_cache = OrderedDict()
+        self._dtz_cache = OrderedDict()
+        self.hits = 0
+        self.probes = 0
+
+    def close(self):
+        self._tables.close()
+
+    def can_probe(self, board) -> bool:
+        """True if the position is small enough and castling is gone."""
+        return popcount(board.occupied) <= self.max_pieces and board._castling_rights() == 0
+
+    def _cached(self, cache, probe, board):
+        """Result of probe(board), looked up by Zobrist key first."""
+        key = board.zobrist_key
+        if key in cache:
+            cache.move_to_end(key)
+            self.hits += 1
+            return cache[key]
+
+        self.probes += 1
+        result = probe(board)
+        cache[key] = result
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return result
+
+    def _probe_wdl_tables(self, board):
+        import chess
+
+        return self._tables.get_wdl(chess.Board(board.to_fen()))
+
+    def _probe_dtz_tables(self, board):
+        # DTZ probes may have to probe every reply, so only the root asks
+        import chess
+
+        return self._tables.get_dtz(chess.Board(board.to_fen()))
+
+    def probe_wdl(self, board):
+        """Win/draw/loss (2 to -2) for the side to move, or None."""
+        if not self.can_probe(board):
+            return None
+        return self._cached(self._wdl_cache, self._probe_wdl_tables, board)
+
+    def best_move(self, board):
+        """
+        Root move that keeps the best tablebase result.
+
+        Wins go for the shortest distance to a zeroing move, losses for the
+        longest, so won endings make progress instead of repeating.
+
+        Returns:
+            A move, or None if the position or a reply is not in the tables
+        """
+        if not self.can_probe(board):
+            return None
+        best_move = None
+        best_rank = None
+        for move in list(board.generate_legal_moves()):
+            undo = board.make_move(move[0], move[1])
+            zeroing = board.moves_since_capture_or_pawn == 0
+            wdl = self._cached(self._wdl_cache, self._probe_wdl_tables, board)
+            mated = wdl is not None and not board.has_any_legal_moves(board.side_to_move) \
+                and board.is_in_check(board.side_to_move)
+            dtz = None
+            if wdl is not None and not mated:
+                dtz = self._cached(self._dtz_cache, self._probe_dtz_tables, board)
+            board.unmake_move(undo)
+            if mated:
+                return move
+            if wdl is None or dtz is None:
+                return None
+            # the reply's result is ours negated; dtz counts from the reply
+            result = -wdl
+            if result > DRAW:
+                rank = (result, 1 if zeroing else 0, dtz)   # dtz < 0: nearer zero is faster
+            elif result < DRAW:
+                rank = (result, 0, dtz)                     # dtz > 0: larger holds out longer
+            else:
+                rank = (result, 0, 0)
+            if best_rank is None or rank > best_rank:
+                best_rank = rank
+                best_move = move
+        return best_move
+
+
+def get_tablebase(directory: str):
+    """
+    Tablebases in `directory`, opened once per process and then shared.
+
+    Returns:
+        A Tablebase, or None when directory is None or holds no tables
+    """
+    if directory is None:
+        return None
+    directory = os.path.abspath(directory)
+    if directory not in _tablebases:
+        tablebase = Tablebase(directory) if os.path.isdir(directory) else None
+        if tablebase is not None and tablebase.max_pieces == 0:
+            tablebase.close()
+            tablebase = None
+        _tablebases[directory] = tablebase
+    return _tablebases[directory]
@@ -0,0 +1,67 @@
+from collections import namedtuple
+
+# Bound types: how a stored score relates to the true value of the position
+EXACT = 0
+LOWER = 1  # search failed high, true score >= stored score
+UPPER = 2  # search failed low, true score <= stored score
+
+TTEntry = namedtuple('TTEntry', ['key', 'depth', 'bound', 'score', 'move', 'age'])
+
+# Rough size of one stored entry in CPython (tuple, key int, move tuples)
+ENTRY_BYTES = 200
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table keyed by Board.zobrist_key.
+
+    Each bucket has two slots: a depth-preferred slot that keeps the
+    deepest result for its bucket, and an always-replace slot that takes
+    whatever the depth-preferred slot refuses. Entries written during an
+    earlier search (see new_search) no longer protect their slot.
+
+    Scores are stored as the owning bot sees them, so a table must not be
+    shared between bots playing different colors.
+    """
+
+    def __init__(self, size_mb: float = 16):
+        """
+        Initialize the table.
+
+        Args:
+            size_mb: approximate memory budget in megabytes
+        """
+        self.num_buckets = max(1, int(size_mb * 1024 * 1024) // (2 * ENTRY_BYTES))
+        self.depth_slots = [None] * self.num_buckets
+        self.recent_slots = [None] * self.num_buckets
+        self.age = 0
+
+    def new_search(self):
+        """Mark entries from previous searches as replaceable."""
+        self.age += 1
+
+    def clear(self):
+        self.depth_slots = [None] * self.num_buckets
+        self.recent_slots = [None] * self.num_buckets
+        self.age = 0
+
+    def probe(self, key: int):
+        """Return the entry stored for `key`, or None."""
+        index = key % self.num_buckets
+        entry = self.depth_slots[index]
+        if entry is not None and entry.key == key:
+            return entry
+        entry = self.recent_slots[index]
+        if entry is not None and entry.key == key:
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, bound: int, score, move):
+        index = key % self.num_buckets
+        entry = TTEntry(key, depth, bound, score, move, self.age)
+        current = self.depth_slots[index]
+        if (current is None or current.key == key or current.depth <= depth
+                or current.age != self.age):
+            self.depth_slots[index] = entry
+        else:
+            self.recent_slots[index] = entry
@@ -0,0 +1,84 @@
+"""
+Scaling benchmark for the parallel AlphaBetaBot search.
+
+Searches a fixed set of positions to a fixed depth with 1, 2, ... N worker
+processes and reports time, nodes and speedup against the single-process
+search. Run from the repository root:
+
+    python src/bench_parallel.py --depth 4 --max-workers 8
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from board import Board
+from models.bot import AlphaBetaBot
+
+# Move sequences from the start position, ((from_row, from_col), (to_row, to_col))
+POSITIONS = {
+    'italian': [((6, 4), (4, 4)), ((1, 4), (3, 4)), ((7, 6), (5, 5)), ((0, 1), (2, 2)),
+                ((7, 5), (4, 2)), ((0, 5), (3, 2)), ((6, 2), (5, 2)), ((0, 6), (2, 5))],
+    'queens_gambit': [((6, 3), (4, 3)), ((1, 3), (3, 3)), ((6, 2), (4, 2)), ((1, 4), (2, 4)),
+                      ((7, 1), (5, 2)), ((0, 6), (2, 5)), ((7, 2), (3, 6)), ((0, 5), (1, 4))],
+    'sicilian': [((6, 4), (4, 4)), ((1, 2), (3, 2)), ((7, 6), (5, 5)), ((1, 3), (2, 3)),
+                 ((6, 3), (4, 3)), ((3, 2), (4, 3)), ((5, 5), (4, 3)), ((0, 6), (2, 5)),
+                 ((7, 1), (5, 2)), ((1, 0), (2, 0))],
+}
+
+
+def _board_after(moves):
+    board = Board()
+    for move in moves:
+        board.move_piece(*move)
+    return board
+
+
+def run(depth: int, worker_counts):
+    """Time every position at `depth` for each worker count; returns {workers: (seconds, nodes)}."""
+    results = {}
+    for workers in worker_counts:
+        total_time = 0.0
+        total_nodes = 0
+        for moves in POSITIONS.values():
+            board = _board_after(moves)
+            bot = AlphaBetaBot(color=board.side_to_move, depth=depth, workers=workers)
+            # start the worker processes before the clock runs; depth 2 is the
+            # shallowest search that uses them, and keeps their tables nearly
+            # empty so the timed search does not inherit a warm cache
+            bot.depth = 2
+            bot.get_move(Board())
+            bot.depth = depth
+            bot.tt.clear()
+            start = time.perf_counter()
+            bot.get_move(board)
+            total_time += time.perf_counter() - start
+            total_nodes += sum(bot.node_counts)
+            bot.close()
+        results[workers] = (total_time, total_nodes)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--depth', type=int, default=4, help='fixed search depth')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1,
+                        help='largest worker count to measure')
+    args = parser.parse_args()
+
+    counts = list(range(1, max(1, args.max_workers) + 1))
+    results = run(args.depth, counts)
+    base_time = results[1][0]
+    print(f"depth {args.depth}, {len(POSITIONS)} positions")
+    print(f"{'workers':>7} {'seconds':>9} {'nodes':>9} {'nodes/s':>9} {'speedup':>8}")
+    for workers in counts:
+        seconds, nodes = results[workers]
+        print(f"{workers:>7} {seconds:>9.2f} {nodes:>9} {nodes / seconds:>9.0f} {base_time / seconds:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+# Bitboard helpers shared by Board and Piece.
+# A square index is row * 8 + col, so bit 0 is a8 and bit 63 is h1, matching
+# the (row, col) layout of Board.squares (row 0 is black's back rank).
+
+KNIGHT_MOVES = [
+    (1, 2), (1, -2), (-1, 2), (-1, -2),
+    (2, 1), (2, -1), (-2, 1), (-2, -1)
+]
+ROOK_MOVES = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+BISHOP_MOVES = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+KING_MOVES = [
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1),           (0, 1),
+    (1, -1),  (1, 0),  (1, 1)
+]
+
+
+ALL_SQUARES = (1 << 64) - 1
+# (row, col) of every square index, so move lists need no divmod
+SQUARE_COORDS = tuple(divmod(sq, 8) for sq in range(64))
+# Back ranks (rows 0 and 7), where pawns promote
+PROMOTION_SQUARES = 0xFF | (0xFF << 56)
+
+
+def popcount(bb):
+    return bin(bb).count('1')
+
+
+def iter_bits(bb):
+    """Yield the square index of every set bit, lowest first."""
+    while bb:
+        lsb = bb & -bb
+        yield lsb.bit_length() - 1
+        bb ^= lsb
+
+
+def _leaper_table(offsets):
+    table = []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        bb = 0
+        for dr, dc in offsets:
+            r = row + dr
+            c = col + dc
+            if 0 <= r <= 7 and 0 <= c <= 7:
+                bb |= 1 << (r * 8 + c)
+        table.append(bb)
+    return table
+
+
+def _ray_table(dr, dc):
+    table = []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        bb = 0
+        r = row + dr
+        c = col + dc
+        while 0 <= r <= 7 and 0 <= c <= 7:
+            bb |= 1 << (r * 8 + c)
+            r += dr
+            c += dc
+        table.append(bb)
+    return table
+
+
+KNIGHT_ATTACKS = _leaper_table(KNIGHT_MOVES)
+KING_ATTACKS = _leaper_table(KING_MOVES)
+# Squares attacked by a pawn of the given color standing on a square
+PAWN_ATTACKS = {
+    1: _leaper_table([(-1, -1), (-1, 1)]),
+    -1: _leaper_table([(1, -1), (1, 1)]),
+}
+
+
+def _between_table():
+    # BETWEEN[a][b]: squares strictly between a and b on a shared line, else 0
+    table = [[0] * 64 for _ in range(64)]
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        for dr, dc in ROOK_MOVES + BISHOP_MOVES:
+            bb = 0
+            r = row + dr
+            c = col + dc
+            while 0 <= r <= 7 and 0 <= c <= 7:
+                table[sq][r * 8 + c] = bb
+                bb |= 1 << (r * 8 + c)
+                r += dr
+                c += dc
+    return table
+
+
+BETWEEN = _between_table()
+
+
+def _line_table():
+    # LINE[a][b]: the whole rank, file or diagonal through a and b, else 0
+    table = [[0] * 64 for _ in range(64)]
+    for dr, dc in ROOK_MOVES[::2] + BISHOP_MOVES[:2]:
+        forward = _ray_table(dr, dc)
+        backward = _ray_table(-dr, -dc)
+        for sq in range(64):
+            line = forward[sq] | backward[sq] | (1 << sq)
+            for other in iter_bits(forward[sq]):
+                table[sq][other] = table[other][sq] = line
+    return table
+
+
+LINE = _line_table()
+
+
+def _square_rays(directions):
+    # Per square, (ray, direction increases the square index, ray table) for
+    # every direction that is not off the board. The flag tells which end of
+    # the blocker set is nearest to the origin.
+    tables = [(_ray_table(dr, dc), dr * 8 + dc > 0) for dr, dc in directions]
+    return [tuple((table[sq], positive, table) for table, positive in tables if table[sq])
+            for sq in range(64)]
+
+
+ROOK_RAYS = _square_rays(ROOK_MOVES)
+BISHOP_RAYS = _square_rays(BISHOP_MOVES)
+QUEEN_RAYS = _square_rays(ROOK_MOVES + BISHOP_MOVES)
+
+
+def _slide(sq, occupied, square_rays):
+    attacks = 0
+    for ray, positive, table in square_rays[sq]:
+        blockers = ray & occupied
+        if blockers:
+            if positive:
+                first = (blockers & -blockers).bit_length() - 1
+            else:
+                first = blockers.bit_length() - 1
+            # keep the first blocker, drop everything behind it
+            ray ^= table[first]
+        attacks |= ray
+    return attacks
+
+
+def rook_attacks(sq, occupied):
+    return _slide(sq, occupied, ROOK_RAYS)
+
+
+def bishop_attacks(sq, occupied):
+    return _slide(sq, occupied, BISHOP_RAYS)
+
+
+def queen_attacks(sq, occupied):
+    return _slide(sq, occupied, QUEEN_RAYS)
@@ -1,19 +1,95 @@
 import numpy as np
 from piece import Piece
+from bitboard import (
+    ALL_SQUARES, PROMOTION_SQUARES, SQUARE_COORDS, KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS,
+    BETWEEN, LINE, rook_attacks, bishop_attacks, queen_attacks, popcount, iter_bits,
+)
+from zobrist import PIECE_KEYS, SIDE_KEY, CASTLING_KEYS, EP_KEYS
+from evaluation import PIECE_SQUARE_SCORES
+
+# FEN piece letters (white upper case, black lower case)
+FEN_PIECES = {'P': 1, 'N': 2, 'B': 3, 'R': 4, 'Q': 5, 'K': 6,
+              'p': -1, 'n': -2, 'b': -3, 'r': -4, 'q': -5, 'k': -6}
+FEN_LETTERS = {value: letter for letter, value in FEN_PIECES.items()}
+FILES = 'abcdefgh'
+
+# Rook home squares (row * 8 + col) and the castling flag each one guards
+ROOK_HOME_FLAGS = {
+    63: 'white_rook_kingside_moved',
+    56: 'white_rook_queenside_moved',
+    7: 'black_rook_kingside_moved',
+    0: 'black_rook_queenside_moved',
+}
+
+
+class Position:
+    """
+    Immutable snapshot of a Board position, small and cheap to pickle.
+
+    The placement holds piece + 6 for each square index as 64 bytes,
+    castling is the 4-bit mask of Board._castling_rights and en_passant is
+    a square index or -1. Move history is left out, so a Board rebuilt from
+    a snapshot only knows its own position for repetition checks.
+    """
+    __slots__ = ('placement', 'side_to_move', 'castling', 'en_passant',
+                 'halfmove_clock', 'fullmove_number', 'key')
+
+    def __init__(self, placement, side_to_move, castling, en_passant,
+                 halfmove_clock, fullmove_number, key):
+        values = (placement, side_to_move, castling, en_passant, halfmove_clock, fullmove_number, key)
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Position is immutable")
+
+    def _fields(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __reduce__(self):
+        return Position, self._fields()
+
+    def __eq__(self, other):
+        return isinstance(other, Position) and self._fields() == other._fields()
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"Position(key={self.key:#018x}, side_to_move={self.side_to_move})"
 
 
 class Board:
     def __init__(self):
-        
-        self.squares = np.zeros((8, 8))
-
-        #black start
-        self.squares[0] = [-4, -2, -3, -5, -6, -3, -2, -4] #back line
-        self.squares[1] = [-1] * 8 # pawns
 
-        #white start
-        self.squares[6] = [1] * 8
-        self.squares[7] = [4, 2, 3, 5, 6, 3, 2, 4]
+        # One bitboard per piece value, indexed by piece + 6 (index 6 is unused)
+        self.bitboards = [0] * 13
+        # Occupancy per color (1 white, -1 black) and for both sides
+        self.occupancy = {1: 0, -1: 0}
+        self.occupied = 0
+        # Piece value per square index, kept in sync with the bitboards
+        self.mailbox = [0] * 64
+        self._squares_view = None
+        # (position, legal moves, in check) of the last position asked for
+        self._legal_cache = None
+        # (zobrist key, {color: attack map}) of the last position asked for
+        self._attack_cache = None
+        # Zobrist key of the position, updated incrementally as pieces move
+        self.zobrist_key = 0
+        # Material plus piece-square score, white minus black, also incremental
+        self.psq_score = 0
+
+        back_rank = [4, 2, 3, 5, 6, 3, 2, 4]
+        for col in range(8):
+            #black start
+            self.add_piece(-back_rank[col], 0, col)
+            self.add_piece(-1, 1, col)
+            #white start
+            self.add_piece(1, 6, col)
+            self.add_piece(back_rank[col], 7, col)
 
         # flags for rochade
         self.white_king_moved = False
@@ -28,166 +104,446 @@ class Board:
         self.en_passant_target = None
         
         # Track move history for detecting repetition and fifty-move rule
-        self.move_history = []  # List of board positions (as tuples for hashing)
+        self.move_history = []  # Zobrist key of every position reached, starting one included
         self.moves_since_capture_or_pawn = 0  # For fifty-move rule
+        self.fullmove_number = 1  # incremented after each black move, as in FEN
+
+        self.zobrist_key = self.compute_zobrist_key()
+        self.move_history.append(self.zobrist_key)
+
+    @property
+    def squares(self):
+        """Read-only 8x8 int8 view of the position, rebuilt lazily after a change."""
+        if self._squares_view is None:
+            view = np.array(self.mailbox, dtype=np.int8).reshape(8, 8)
+            view.flags.writeable = False
+            self._squares_view = view
+        return self._squares_view
+
+    @squares.setter
+    def squares(self, array):
+        self.bitboards = [0] * 13
+        self.occupancy = {1: 0, -1: 0}
+        self.occupied = 0
+        self.mailbox = [0] * 64
+        self._squares_view = None
+        self.psq_score = 0
+        for row in range(8):
+            for col in range(8):
+                piece = int(array[row][col])
+                if piece != 0:
+                    self._put(piece, row * 8 + col)
+        self.zobrist_key = self.compute_zobrist_key()
+        self.move_history = [self.zobrist_key]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_squares_view'] = None
+        state['_legal_cache'] = None
+        state['_attack_cache'] = None
+        return state
+
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        Board set up from a FEN string.
+
+        EPD lines are accepted too: fields after the en passant square that
+        are not move counters are ignored.
+        """
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError(f"Incomplete FEN: {fen!r}")
+        placement, side, castling, ep = fields[:4]
+
+        board = cls._empty()
+        ranks = placement.split('/')
+        if len(ranks) != 8:
+            raise ValueError(f"FEN placement needs 8 ranks: {fen!r}")
+        for row, rank in enumerate(ranks):
+            col = 0
+            for ch in rank:
+                if ch.isdigit():
+                    col += int(ch)
+                elif ch in FEN_PIECES and col < 8:
+                    board._put(FEN_PIECES[ch], row * 8 + col)
+                    col += 1
+                else:
+                    raise ValueError(f"Bad FEN rank {rank!r}: {fen!r}")
+            if col != 8:
+                raise ValueError(f"Bad FEN rank {rank!r}: {fen!r}")
+
+        if side not in ('w', 'b'):
+            raise ValueError(f"Bad FEN side to move {side!r}: {fen!r}")
+        board.side_to_move = 1 if side == 'w' else -1
+        if castling != '-' and not set(castling) <= set('KQkq'):
+            raise ValueError(f"Bad FEN castling rights {castling!r}: {fen!r}")
+        board._set_castling_rights(sum(bit for bit, letter in ((1, 'K'), (2, 'Q'), (4, 'k'), (8, 'q'))
+                                       if letter in castling))
+        if ep == '-':
+            board.en_passant_target = None
+        elif len(ep) == 2 and ep[0] in FILES and ep[1] in '36':
+            board.en_passant_target = (8 - int(ep[1]), FILES.index(ep[0]))
+        else:
+            raise ValueError(f"Bad FEN en passant square {ep!r}: {fen!r}")
+
+        counters = fields[4:6]
+        board.moves_since_capture_or_pawn = int(counters[0]) if counters and counters[0].isdigit() else 0
+        board.fullmove_number = int(counters[1]) if len(counters) == 2 and counters[1].isdigit() else 1
+
+        board.zobrist_key = board.compute_zobrist_key()
+        board.move_history = [board.zobrist_key]
+        return board
+
+    @classmethod
+    def _empty(cls):
+        """Board with no pieces and no game state set, for the alternate constructors."""
+        board = cls.__new__(cls)
+        board.bitboards = [0] * 13
+        board.occupancy = {1: 0, -1: 0}
+        board.occupied = 0
+        board.mailbox = [0] * 64
+        board._squares_view = None
+        board._legal_cache = None
+        board._attack_cache = None
+        board.zobrist_key = 0
+        board.psq_score = 0
+        return board
+
+    def snapshot(self):
+        """Immutable Position of the current position (see Position)."""
+        ep = self.en_passant_target
+        return Position(
+            bytes(map((6).__add__, self.mailbox)),
+            self.side_to_move,
+            self._castling_rights(),
+            -1 if ep is None else ep[0] * 8 + ep[1],
+            self.moves_since_capture_or_pawn,
+            self.fullmove_number,
+            self.zobrist_key,
+        )
 
+    @classmethod
+    def from_snapshot(cls, position):
+        """Board set up from a Position; its move history starts here."""
+        board = cls._empty()
+        # fill the bitboards directly; the key comes with the snapshot
+        mailbox = board.mailbox = list(map((-6).__add__, position.placement))
+        bitboards = board.bitboards
+        psq_score = 0
+        for sq, piece in enumerate(mailbox):
+            if piece:
+                bitboards[piece + 6] |= 1 << sq
+                psq_score += PIECE_SQUARE_SCORES[piece + 6][sq]
+        white = bitboards[7] | bitboards[8] | bitboards[9] | bitboards[10] | bitboards[11] | bitboards[12]
+        black = bitboards[0] | bitboards[1] | bitboards[2] | bitboards[3] | bitboards[4] | bitboards[5]
+        board.occupancy = {1: white, -1: black}
+        board.occupied = white | black
+        board.psq_score = psq_score
+        board.side_to_move = position.side_to_move
+        board._set_castling_rights(position.castling)
+        ep = position.en_passant
+        board.en_passant_target = None if ep < 0 else divmod(ep, 8)
+        board.moves_since_capture_or_pawn = position.halfmove_clock
+        board.fullmove_number = position.fullmove_number
+        board.zobrist_key = position.key
+        board.move_history = [position.key]
+        return board
+
+    def to_fen(self):
+        """FEN string of the position."""
+        ranks = []
+        for row in range(8):
+            rank = ''
+            empty = 0
+            for piece in self.mailbox[row * 8:row * 8 + 8]:
+                if piece == 0:
+                    empty += 1
+                    continue
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                rank += FEN_LETTERS[piece]
+            if empty:
+                rank += str(empty)
+            ranks.append(rank)
+
+        rights = self._castling_rights()
+        castling = ''.join(letter for bit, letter in ((1, 'K'), (2, 'Q'), (4, 'k'), (8, 'q')) if rights & bit)
+        if self.en_passant_target is None:
+            ep = '-'
+        else:
+            row, col = self.en_passant_target
+            ep = FILES[col] + str(8 - row)
+        side = 'w' if self.side_to_move == 1 else 'b'
+        return (f"{'/'.join(ranks)} {side} {castling or '-'} {ep} "
+                f"{self.moves_since_capture_or_pawn} {self.fullmove_number}")
+
+    def copy(self):
+        """Independent copy of the position, e.g. for a search on another thread."""
+        board = Board.__new__(Board)
+        board.__dict__.update(self.__getstate__())
+        board.bitboards = list(self.bitboards)
+        board.occupancy = dict(self.occupancy)
+        board.mailbox = list(self.mailbox)
+        board.move_history = list(self.move_history)
+        return board
+
+    def _put(self, piece, sq):
+        bit = 1 << sq
+        self.mailbox[sq] = piece
+        self.bitboards[piece + 6] |= bit
+        self.occupancy[1 if piece > 0 else -1] |= bit
+        self.occupied |= bit
+        self.zobrist_key ^= PIECE_KEYS[piece + 6][sq]
+        self.psq_score += PIECE_SQUARE_SCORES[piece + 6][sq]
+        self._squares_view = None
+
+    def _remove(self, sq):
+        piece = self.mailbox[sq]
+        if piece != 0:
+            bit = 1 << sq
+            self.mailbox[sq] = 0
+            self.bitboards[piece + 6] ^= bit
+            self.occupancy[1 if piece > 0 else -1] ^= bit
+            self.occupied ^= bit
+            self.zobrist_key ^= PIECE_KEYS[piece + 6][sq]
+            self.psq_score -= PIECE_SQUARE_SCORES[piece + 6][sq]
+            self._squares_view = None
+        return piece
+
+    def _castling_rights(self):
+        """Castling rights as a 4-bit mask: 1/2 white king/queenside, 4/8 black."""
+        rights = 0
+        if not self.white_king_moved:
+            if not self.white_rook_kingside_moved:
+                rights |= 1
+            if not self.white_rook_queenside_moved:
+                rights |= 2
+        if not self.black_king_moved:
+            if not self.black_rook_kingside_moved:
+                rights |= 4
+            if not self.black_rook_queenside_moved:
+                rights |= 8
+        return rights
+
+    def _set_castling_rights(self, rights):
+        """Set the castling flags from a _castling_rights mask; lost rights count as moved."""
+        self.white_king_moved = not rights & 3
+        self.black_king_moved = not rights & 12
+        self.white_rook_kingside_moved = not rights & 1
+        self.white_rook_queenside_moved = not rights & 2
+        self.black_rook_kingside_moved = not rights & 4
+        self.black_rook_queenside_moved = not rights & 8
+
+    def compute_zobrist_key(self):
+        """Zobrist key computed from scratch (zobrist_key holds the incremental one)."""
+        key = 0
+        for sq in iter_bits(self.occupied):
+            key ^= PIECE_KEYS[self.mailbox[sq] + 6][sq]
+        if self.side_to_move == -1:
+            key ^= SIDE_KEY
+        key ^= CASTLING_KEYS[self._castling_rights()]
+        if self.en_passant_target is not None:
+            key ^= EP_KEYS[self.en_passant_target[1]]
+        return key
+
+    def compute_psq_score(self):
+        """Material plus piece-square score computed from scratch (see psq_score)."""
+        return sum(PIECE_SQUARE_SCORES[self.mailbox[sq] + 6][sq] for sq in iter_bits(self.occupied))
+
+    def piece_at(self, row, col):
+        return self.mailbox[row * 8 + col]
+
+    def piece_count(self, piece):
+        """Number of pieces with the given signed value (e.g. -3 for black bishops)."""
+        return popcount(self.bitboards[piece + 6])
+
+    def king_square(self, color):
+        """Square index of the king of `color`, or None if it has none."""
+        king_bb = self.bitboards[6 * color + 6]
+        return king_bb.bit_length() - 1 if king_bb else None
+
+    def piece_squares(self, color):
+        """Square indices of the pieces of `color`, lowest first."""
+        return list(iter_bits(self.occupancy[color]))
 
     def add_piece(self, piece, row, col):
         
-        self.squares[row][col] = piece
+        sq = row * 8 + col
+        self._remove(sq)
+        if piece != 0:
+            self._put(int(piece), sq)
 
     def move_piece(self, start_pos, end_pos):
         initial_row, initial_col = start_pos
         final_row, final_col = end_pos
-        piece = self.squares[initial_row][initial_col]
-        
+        start = initial_row * 8 + initial_col
+        end = final_row * 8 + final_col
+        if self.mailbox[start] == 0:
+            raise ValueError(f"No piece to move on {start_pos}")
+        piece = self._remove(start)
+        piece_type = abs(piece)
+        color = 1 if piece > 0 else -1
+
         # Save what's at the destination BEFORE any moves (for capture detection)
-        captured_piece = self.squares[final_row][final_col]
-        is_pawn_move = abs(int(piece)) == 1
-        
-        # 1. HANDLE EN PASSANT CAPTURE
-        # If a pawn moves diagonally to an empty square, it MUST be En Passant
-        if abs(piece) == 1 and self.squares[final_row][final_col] == 0 and initial_col != final_col:
-            # The captured pawn is on the same row as the start, at the final column
-            self.squares[initial_row][final_col] = 0 
-
-        # 2. UPDATE EN PASSANT TARGET
-        # If a pawn moves 2 squares, set the target square behind it
-        if abs(piece) == 1 and abs(final_row - initial_row) == 2:
-            mid_row = (initial_row + final_row) // 2
-            self.en_passant_target = (mid_row, initial_col)
-        else:
-            self.en_passant_target = None
+        captured_piece = self._remove(end)
+        is_pawn_move = piece_type == 1
 
-        prev_en_passant = self.en_passant_target
-
-        if int(piece) == 6:
-            self.white_king_moved = True
-        if int(piece) == -6:
-            self.black_king_moved = True
-        # Rooks
-        if int(piece) == 4:
-            if (initial_row, initial_col) == (7, 7):
-                self.white_rook_kingside_moved = True
-            if (initial_row, initial_col) == (7, 0):
-                self.white_rook_queenside_moved = True
-        if int(piece) == -4:
-            if (initial_row, initial_col) == (0, 7):
-                self.black_rook_kingside_moved = True
-            if (initial_row, initial_col) == (0, 0):
-                self.black_rook_queenside_moved = True
-
-        if abs(int(piece)) == 6 and initial_row == final_row and abs(final_col - initial_col) == 2:
-            # Determine rook source/target
-            if final_col == 6:  # kingside
-                rook_src_col = 7
-                rook_dst_col = 5
-            elif final_col == 2:  # queenside
-                rook_src_col = 0
-                rook_dst_col = 3
-            else:
-                rook_src_col = None
-
-            self.squares[final_row][final_col] = piece
-            self.squares[initial_row][initial_col] = 0
-
-            # Move rook if present
-            if rook_src_col is not None and self.is_on_board(initial_row, rook_src_col):
-                self.squares[initial_row][rook_dst_col] = self.squares[initial_row][rook_src_col]
-                # mark rook moved flag based on color and side
-                rook_val = int(self.squares[initial_row][rook_dst_col])
-                if rook_val == 4:
-                    # white rook moved
-                    if rook_src_col == 7:
-                        self.white_rook_kingside_moved = True
-                    if rook_src_col == 0:
-                        self.white_rook_queenside_moved = True
-                if rook_val == -4:
-                    if rook_src_col == 7:
-                        self.black_rook_kingside_moved = True
-                    if rook_src_col == 0:
-                        self.black_rook_queenside_moved = True
-
-                self.squares[initial_row][rook_src_col] = 0
-            # flip side to move after successful castling
-            self.side_to_move *= -1
-            return
+        if is_pawn_move:
+            # En passant: a pawn moving diagonally to an empty square captures
+            # the pawn beside its start square, on the final column
+            if captured_piece == 0 and initial_col != final_col:
+                captured_piece = self._remove(initial_row * 8 + final_col)
+            # Promotion: promote pawn to queen (5) when reaching last rank
+            if final_row == 0 or final_row == 7:
+                piece = 5 * color
 
-        
-        # Handle en-passant capture: if moving pawn to previous en_passant_target, remove the captured pawn
-        if abs(int(piece)) == 1 and prev_en_passant is not None and (final_row, final_col) == tuple(prev_en_passant):
-            # remove the pawn that moved two squares last turn
-            direction = -1 if int(piece) > 0 else 1
-            captured_row = final_row - direction
-            self.squares[captured_row][final_col] = 0
+        self._put(piece, end)
 
-        self.squares[final_row][final_col] = piece
-        self.squares[initial_row][initial_col] = 0
+        touches_castling = piece_type == 6 or start in ROOK_HOME_FLAGS or end in ROOK_HOME_FLAGS
+        if touches_castling:
+            self.zobrist_key ^= CASTLING_KEYS[self._castling_rights()]
+
+        if piece_type == 6:
+            if color == 1:
+                self.white_king_moved = True
+            else:
+                self.black_king_moved = True
+
+            # Castling: the king moves two squares, the rook jumps over it
+            if initial_row == final_row and abs(final_col - initial_col) == 2:
+                if final_col == 6:  # kingside
+                    rook_src_col, rook_dst_col = 7, 5
+                else:  # queenside
+                    rook_src_col, rook_dst_col = 0, 3
+                rook = self._remove(initial_row * 8 + rook_src_col)
+                if rook != 0:
+                    self._put(rook, initial_row * 8 + rook_dst_col)
+
+        # Moving from or capturing on a rook home square loses that castling right
+        if start in ROOK_HOME_FLAGS:
+            setattr(self, ROOK_HOME_FLAGS[start], True)
+        if end in ROOK_HOME_FLAGS:
+            setattr(self, ROOK_HOME_FLAGS[end], True)
+
+        if touches_castling:
+            self.zobrist_key ^= CASTLING_KEYS[self._castling_rights()]
 
         # Pawn double move -> set en_passant target for opponent, otherwise clear
-        if abs(int(piece)) == 1 and abs(final_row - initial_row) == 2:
-            ep_row = (initial_row + final_row) // 2
-            self.en_passant_target = (ep_row, final_col)
+        if self.en_passant_target is not None:
+            self.zobrist_key ^= EP_KEYS[self.en_passant_target[1]]
+        if is_pawn_move and abs(final_row - initial_row) == 2:
+            self.en_passant_target = ((initial_row + final_row) // 2, initial_col)
+            self.zobrist_key ^= EP_KEYS[initial_col]
         else:
             self.en_passant_target = None
 
-        # Promotion: promote pawn to queen (5) when reaching last rank
-        if int(piece) == 1 and final_row == 0:
-            self.squares[final_row][final_col] = 5
-        if int(piece) == -1 and final_row == 7:
-            self.squares[final_row][final_col] = -5
-        
         # Update fifty-move rule counter
         if captured_piece != 0 or is_pawn_move:
             self.moves_since_capture_or_pawn = 0
         else:
             self.moves_since_capture_or_pawn += 1
+        if self.side_to_move == -1:
+            self.fullmove_number += 1
         
-        # flip side to move after normal move
+        # flip side to move
         self.side_to_move *= -1
+        self.zobrist_key ^= SIDE_KEY
         
         # Store current position in move history AFTER flipping side_to_move
-        board_state = self._get_board_state()
-        self.move_history.append(board_state)
+        self.move_history.append(self.zobrist_key)
+
+    def make_move(self, start_pos, end_pos):
+        """
+        Play a move in place and return an undo record for unmake_move.
+
+        The record holds the move squares, the moving piece, the captured
+        piece and its square, the castling flags, the en passant target, the
+        fifty-move counter and the Zobrist key; the history entry is popped
+        on unmake.
+        """
+        start = start_pos[0] * 8 + start_pos[1]
+        end = end_pos[0] * 8 + end_pos[1]
+        piece = self.mailbox[start]
+        captured_sq = end
+        captured_piece = self.mailbox[end]
+        if captured_piece == 0 and (piece == 1 or piece == -1) and start % 8 != end % 8:
+            # en passant: the captured pawn sits beside the start square
+            captured_sq = start - start % 8 + end % 8
+            captured_piece = self.mailbox[captured_sq]
+
+        undo = (
+            start, end, piece, captured_piece, captured_sq,
+            self._castling_flags(), self.en_passant_target,
+            self.moves_since_capture_or_pawn, self.zobrist_key,
+        )
+        self.move_piece(start_pos, end_pos)
+        return undo
+
+    def unmake_move(self, undo):
+        """Take back the move described by a record from make_move."""
+        start, end, piece, captured_piece, captured_sq, flags, en_passant, fifty, key = undo
+
+        self._remove(end)
+        self._put(piece, start)
+        if captured_piece != 0:
+            self._put(captured_piece, captured_sq)
+
+        if (piece == 6 or piece == -6) and abs(end - start) == 2:
+            # castling: put the rook back in its corner
+            if end > start:
+                rook_src, rook_dst = start + 3, start + 1
+            else:
+                rook_src, rook_dst = start - 4, start - 1
+            self._put(self._remove(rook_dst), rook_src)
 
-    def _get_board_state(self):
-        """Get a hashable representation of the board state including side to move, castling, and en passant."""
-        # Convert numpy array to nested tuple properly
-        board_tuple = tuple(tuple(int(x) for x in row) for row in self.squares)
-        
-        # Include castling rights and en passant in the state
-        castling = (
+        self._set_castling_flags(flags)
+        self.en_passant_target = en_passant
+        self.moves_since_capture_or_pawn = fifty
+        self.side_to_move *= -1
+        if self.side_to_move == -1:
+            self.fullmove_number -= 1
+        self.zobrist_key = key
+        self.move_history.pop()
+
+    def _castling_flags(self):
+        return (
             self.white_king_moved,
             self.black_king_moved,
             self.white_rook_kingside_moved,
             self.white_rook_queenside_moved,
             self.black_rook_kingside_moved,
-            self.black_rook_queenside_moved
+            self.black_rook_queenside_moved,
         )
-        
-        # Convert en passant to tuple or None
-        ep = tuple(self.en_passant_target) if self.en_passant_target else None
-        
-        return (board_tuple, self.side_to_move, castling, ep)
-    
+
+    def _set_castling_flags(self, flags):
+        (
+            self.white_king_moved,
+            self.black_king_moved,
+            self.white_rook_kingside_moved,
+            self.white_rook_queenside_moved,
+            self.black_rook_kingside_moved,
+            self.black_rook_queenside_moved,
+        ) = flags
+
     def is_threefold_repetition(self):
         """Check if the current position has been repeated three times."""
-        # Need at least 9 half-moves for a real threefold repetition
-        # (positions can only repeat after both players have moved at least twice)
-        if len(self.move_history) < 9:
+        history = self.move_history
+        # Only positions since the last capture or pawn move can repeat, and
+        # only every other one has the same side to move
+        limit = min(self.moves_since_capture_or_pawn, len(history) - 1)
+        if limit < 8:
             return False
-        
-        # Get current state (already stored with correct side_to_move)
-        current_state = self._get_board_state()
-        
-        # Count occurrences in the entire history
-        count = 0
-        for state in self.move_history:
-            if state == current_state:
+
+        current_key = self.zobrist_key
+        count = 1
+        for back in range(2, limit + 1, 2):
+            if history[-1 - back] == current_key:
                 count += 1
                 if count >= 3:
                     return True
-        
+
         return False
     
     def is_fifty_move_rule(self):
@@ -198,175 +554,266 @@ class Board:
         return 0 <= row <= 7 and 0 <= col <= 7
 
     def is_square_attacked(self, row, col, by_color):
-        # Pawns
-        pawn_row = row + by_color
-        for dc in (-1, 1):
-            pr = pawn_row
-            pc = col + dc
-            if self.is_on_board(pr, pc):
-                if int(self.squares[pr][pc]) == 1 * by_color:
-                    return True
+        sq = row * 8 + col
+        bitboards = self.bitboards
+
+        # Pawns: look back along the opposite color's capture pattern
+        if PAWN_ATTACKS[-by_color][sq] & bitboards[by_color + 6]:
+            return True
 
         # Knights
-        from piece import KNIGHT_MOVES
-        for dr, dc in KNIGHT_MOVES:
-            r = row + dr
-            c = col + dc
-            if self.is_on_board(r, c):
-                if int(self.squares[r][c]) == 2 * by_color:
-                    return True
+        if KNIGHT_ATTACKS[sq] & bitboards[2 * by_color + 6]:
+            return True
+
+        # King (adjacent)
+        if KING_ATTACKS[sq] & bitboards[6 * by_color + 6]:
+            return True
+
+        queens = bitboards[5 * by_color + 6]
 
         # Rooks & Queens (straight lines)
-        straight_dirs = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        for dr, dc in straight_dirs:
-            r = row + dr
-            c = col + dc
-            while self.is_on_board(r, c):
-                val = int(self.squares[r][c])
-                if val != 0:
-                    if val * by_color > 0 and (abs(val) == 4 or abs(val) == 5):
-                        return True
-                    break
-                r += dr
-                c += dc
+        if rook_attacks(sq, self.occupied) & (bitboards[4 * by_color + 6] | queens):
+            return True
 
         # Bishops & Queens (diagonals)
-        diag_dirs = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        for dr, dc in diag_dirs:
-            r = row + dr
-            c = col + dc
-            while self.is_on_board(r, c):
-                val = int(self.squares[r][c])
-                if val != 0:
-                    if val * by_color > 0 and (abs(val) == 3 or abs(val) == 5):
-                        return True
-                    break
-                r += dr
-                c += dc
-
-        # King (adjacent)
-        for dr in (-1, 0, 1):
-            for dc in (-1, 0, 1):
-                if dr == 0 and dc == 0:
-                    continue
-                r = row + dr
-                c = col + dc
-                if self.is_on_board(r, c):
-                    if int(self.squares[r][c]) == 6 * by_color:
-                        return True
+        if bishop_attacks(sq, self.occupied) & (bitboards[3 * by_color + 6] | queens):
+            return True
 
         return False
 
     def is_in_check(self, color):
-        # Find king
-        king_val = 6 * color
-        for r in range(8):
-            for c in range(8):
-                if int(self.squares[r][c]) == king_val:
-                    return self.is_square_attacked(r, c, -color)
-        return False
+        king_sq = self.king_square(color)
+        if king_sq is None:
+            return False
+        return bool(self.attackers_to(king_sq, -color))
     
+    def attackers_to(self, sq, by_color, occupied=None):
+        """Bitboard of `by_color` pieces attacking square index `sq`."""
+        if occupied is None:
+            occupied = self.occupied
+        bitboards = self.bitboards
+        queens = bitboards[5 * by_color + 6]
+        return (
+            (PAWN_ATTACKS[-by_color][sq] & bitboards[by_color + 6])
+            | (KNIGHT_ATTACKS[sq] & bitboards[2 * by_color + 6])
+            | (KING_ATTACKS[sq] & bitboards[6 * by_color + 6])
+            | (rook_attacks(sq, occupied) & (bitboards[4 * by_color + 6] | queens))
+            | (bishop_attacks(sq, occupied) & (bitboards[3 * by_color + 6] | queens))
+        )
+
+    def attack_map(self, color):
+        """
+        Number of `color` pieces attacking each square, as a read-only 8x8 int8 array.
+
+        Squares held by `color`'s own pieces count as attacked when they are
+        defended. The attack sets of all pieces are unpacked into a bit
+        matrix with NumPy and summed in one go; the map is cached until the
+        pieces move.
+        """
+        entry = self._attack_cache
+        if entry is None or entry[0] != self.zobrist_key:
+            entry = (self.zobrist_key, {})
+            self._attack_cache = entry
+        maps = entry[1]
+        if color not in maps:
+            occupied = self.occupied
+            mailbox = self.mailbox
+            pawn_attacks = PAWN_ATTACKS[color]
+            attacks = []
+            for sq in iter_bits(self.occupancy[color]):
+                piece_type = mailbox[sq] * color
+                if piece_type == 1:
+                    attacks.append(pawn_attacks[sq])
+                elif piece_type == 2:
+                    attacks.append(KNIGHT_ATTACKS[sq])
+                elif piece_type == 3:
+                    attacks.append(bishop_attacks(sq, occupied))
+                elif piece_type == 4:
+                    attacks.append(rook_attacks(sq, occupied))
+                elif piece_type == 5:
+                    attacks.append(queen_attacks(sq, occupied))
+                else:
+                    attacks.append(KING_ATTACKS[sq])
+            # bit sq of each little-endian word lands in column sq
+            bits = np.unpackbits(np.array(attacks, dtype='<u8').view(np.uint8), bitorder='little')
+            counts = bits.reshape(-1, 64).sum(axis=0, dtype=np.int8).reshape(8, 8)
+            counts.flags.writeable = False
+            maps[color] = counts
+        return maps[color]
+
+    def _pinned_pieces(self, king_sq, color):
+        """
+        Bitboard of the pieces of `color` pinned to their king.
+
+        A pinned piece on sq may only move along LINE[king_sq][sq].
+        """
+        them = -color
+        bitboards = self.bitboards
+        queens = bitboards[5 * them + 6]
+        # enemy sliders that would hit the king if our own pieces were not in the way
+        enemy = self.occupancy[them]
+        snipers = (
+            (rook_attacks(king_sq, enemy) & (bitboards[4 * them + 6] | queens))
+            | (bishop_attacks(king_sq, enemy) & (bitboards[3 * them + 6] | queens))
+        )
+        pinned = 0
+        own = self.occupancy[color]
+        for sniper in iter_bits(snipers):
+            blockers = BETWEEN[king_sq][sniper] & self.occupied
+            # exactly one piece in between, and it is ours
+            if blockers & own and not blockers & (blockers - 1):
+                pinned |= blockers
+        return pinned
+
+    def _castling_targets(self, color):
+        """Castling destinations for `color`; assumes the king is not in check."""
+        targets = []
+        start_row = 7 if color == 1 else 0
+        home = start_row * 8
+        mailbox = self.mailbox
+        king_not_moved = (not self.white_king_moved) if color == 1 else (not self.black_king_moved)
+        if mailbox[home + 4] != 6 * color or not king_not_moved:
+            return targets
+        # Kingside
+        if mailbox[home + 7] == 4 * color:
+            rook_kingside_not_moved = (not self.white_rook_kingside_moved) if color == 1 else (not self.black_rook_kingside_moved)
+            if rook_kingside_not_moved and mailbox[home + 5] == 0 and mailbox[home + 6] == 0:
+                if (not self.is_square_attacked(start_row, 5, -color)) and (not self.is_square_attacked(start_row, 6, -color)):
+                    targets.append(home + 6)
+        # Queenside
+        if mailbox[home] == 4 * color:
+            rook_queenside_not_moved = (not self.white_rook_queenside_moved) if color == 1 else (not self.black_rook_queenside_moved)
+            if rook_queenside_not_moved and mailbox[home + 1] == 0 and mailbox[home + 2] == 0 and mailbox[home + 3] == 0:
+                if (not self.is_square_attacked(start_row, 3, -color)) and (not self.is_square_attacked(start_row, 2, -color)):
+                    targets.append(home + 2)
+        return targets
+
+    def generate_legal_moves(self, color=None, captures_only=False):
+        """
+        Yield every legal move for `color` (default: side to move).
+
+        Checkers and pins are worked out once for the position, so moves are
+        produced directly without trying them on the board. This is a
+        generator: stop iterating after the first move to just test whether
+        one exists.
+
+        Args:
+            color: 1 for white, -1 for black
+            captures_only: only yield captures (en passant included) and
+                promotions, e.g. for a quiescence search
+
+        Yields:
+            Move tuples ((from_row, from_col), (to_row, to_col))
+        """
+        if color is None:
+            color = self.side_to_move
+        return self._generate_moves(color, self.occupancy[color], captures_only)
+
+    def _generate_moves(self, color, from_mask, captures_only=False):
+        them = -color
+        own = self.occupancy[color]
+        occupied = self.occupied
+        mailbox = self.mailbox
+        king_bb = self.bitboards[6 * color + 6]
+        # squares worth moving to: anywhere, or enemy pieces only
+        wanted = self.occupancy[them] if captures_only else ALL_SQUARES
+
+        evasion = ALL_SQUARES
+        pinned = 0
+        if king_bb:
+            king_sq = king_bb.bit_length() - 1
+            checkers = self.attackers_to(king_sq, them)
+
+            if from_mask & king_bb:
+                # the king may not step onto an attacked square, including
+                # squares behind it on the line of a checking slider
+                without_king = occupied ^ king_bb
+                for to in iter_bits(KING_ATTACKS[king_sq] & ~own & wanted):
+                    if not self.attackers_to(to, them, without_king):
+                        yield SQUARE_COORDS[king_sq], SQUARE_COORDS[to]
+                if not checkers and not captures_only:
+                    for to in self._castling_targets(color):
+                        yield SQUARE_COORDS[king_sq], SQUARE_COORDS[to]
+
+            if checkers:
+                if checkers & (checkers - 1):
+                    # double check: only the king can move
+                    return
+                checker = checkers.bit_length() - 1
+                # capture the checker or block its line
+                evasion = checkers | BETWEEN[king_sq][checker]
+            pinned = self._pinned_pieces(king_sq, color)
+
+        ep_bit = 0
+        if self.en_passant_target is not None:
+            ep_bit = 1 << (self.en_passant_target[0] * 8 + self.en_passant_target[1])
+
+        for sq in iter_bits(from_mask & ~king_bb):
+            piece = mailbox[sq]
+            targets = Piece.get_targets(self, sq, piece)
+            from_pos = SQUARE_COORDS[sq]
+
+            if targets & ep_bit and (piece == 1 or piece == -1):
+                targets ^= ep_bit
+                # en passant empties two squares on one rank, which a pin
+                # check cannot see, so test the king against the new occupancy
+                ep_sq = ep_bit.bit_length() - 1
+                captured_bit = 1 << (sq - sq % 8 + ep_sq % 8)
+                after = (occupied ^ (1 << sq) ^ captured_bit) | ep_bit
+                if not king_bb or not (self.attackers_to(king_sq, them, after) & ~captured_bit):
+                    yield from_pos, SQUARE_COORDS[ep_sq]
+
+            if piece == 1 or piece == -1:
+                targets &= wanted | PROMOTION_SQUARES
+            else:
+                targets &= wanted
+            targets &= evasion
+            if pinned >> sq & 1:
+                targets &= LINE[king_sq][sq]
+            for to in iter_bits(targets):
+                yield from_pos, SQUARE_COORDS[to]
+
+    def _legal_entry(self):
+        # keyed by side as well, since setup code may flip it by hand
+        position = (self.zobrist_key, self.side_to_move)
+        entry = self._legal_cache
+        if entry is None or entry[0] != position:
+            moves = tuple(self._generate_moves(self.side_to_move, self.occupancy[self.side_to_move]))
+            entry = (position, moves, self.is_in_check(self.side_to_move))
+            self._legal_cache = entry
+        return entry
+
+    def legal_moves(self):
+        """
+        Legal moves of the side to move, cached for the current position.
+
+        The UI asks for the same position many times (drag targets, game
+        over checks, the turn label); the moves are generated once and
+        reused until a move changes the position.
+        """
+        return self._legal_entry()[1]
+
+    def in_check(self):
+        """Whether the side to move is in check, cached alongside legal_moves."""
+        return self._legal_entry()[2]
+
     def get_valid_moves(self, row, col):
-        piece_value = self.squares[row][col]
-        valid_moves = []
-        
+        piece_value = self.mailbox[row * 8 + col]
+
         if piece_value == 0:
-            return valid_moves
+            return []
         # enforce turn: only allow querying moves for side to move
-        if int(piece_value) * self.side_to_move <= 0:
-            return valid_moves
-            
-        piece_type = abs(piece_value)
-        # Pawn (1)
-        if piece_type == 1:
-            valid_moves = Piece.get_pawn_moves(self, row, col, piece_value)   
-        # Knight (2)
-        if piece_type == 2:
-            valid_moves = Piece.get_knight_moves(self, row, col, piece_value)
-        # Bishop (3)
-        if piece_type == 3:
-            valid_moves = Piece.get_bishop_moves(self, row, col, piece_value)
-        # Rook (4)
-        if piece_type == 4:
-            valid_moves = Piece.get_rook_moves(self, row, col, piece_value)      
-        # Queen (5)
-        if piece_type == 5:
-            valid_moves = Piece.get_queen_moves(self, row, col, piece_value)
-        # King (6)
-        if piece_type == 6:
-            # standard king moves
-            valid_moves = Piece.get_king_moves(self, row, col, piece_value)
-
-            color = 1 if piece_value > 0 else -1
-            start_row = 7 if color == 1 else 0
-            # castling
-            king_not_moved = (not self.white_king_moved) if color == 1 else (not self.black_king_moved)
-            if (row, col) == (start_row, 4) and not self.is_in_check(color) and king_not_moved:
-                # Kingside
-                if int(self.squares[start_row][7]) == 4 * color:
-                    rook_kingside_not_moved = (not self.white_rook_kingside_moved) if color == 1 else (not self.black_rook_kingside_moved)
-                    if rook_kingside_not_moved and int(self.squares[start_row][5]) == 0 and int(self.squares[start_row][6]) == 0:
-                        if (not self.is_square_attacked(start_row, 5, -color)) and (not self.is_square_attacked(start_row, 6, -color)):
-                            valid_moves.append((start_row, 6))
-                # Queenside
-                if int(self.squares[start_row][0]) == 4 * color:
-                    rook_queenside_not_moved = (not self.white_rook_queenside_moved) if color == 1 else (not self.black_rook_queenside_moved)
-                    if rook_queenside_not_moved and int(self.squares[start_row][1]) == 0 and int(self.squares[start_row][2]) == 0 and int(self.squares[start_row][3]) == 0:
-                        if (not self.is_square_attacked(start_row, 3, -color)) and (not self.is_square_attacked(start_row, 2, -color)):
-                            valid_moves.append((start_row, 2))
-
-
-        # Filter out moves that would leave own king in check
-        legal_moves = []
-        color = 1 if piece_value > 0 else -1
-
-        # Snapshot flags we need to restore
-        for mv in valid_moves:
-            saved_squares = self.squares.copy()
-            saved_en_passant = getattr(self, 'en_passant_target', None)
-            saved_flags = (
-                self.white_king_moved,
-                self.black_king_moved,
-                self.white_rook_kingside_moved,
-                self.white_rook_queenside_moved,
-                self.black_rook_kingside_moved,
-                self.black_rook_queenside_moved,
-                self.side_to_move,
-            )
-
-            # Make the move
-            self.move_piece((row, col), mv)
-
-            if not self.is_in_check(color):
-                legal_moves.append(mv)
-
-            self.squares = saved_squares
-            self.en_passant_target = saved_en_passant
-            (
-                self.white_king_moved,
-                self.black_king_moved,
-                self.white_rook_kingside_moved,
-                self.white_rook_queenside_moved,
-                self.black_rook_kingside_moved,
-                self.black_rook_queenside_moved,
-                self.side_to_move,
-            ) = saved_flags
-
-        return legal_moves
+        if piece_value * self.side_to_move <= 0:
+            return []
+
+        start = (row, col)
+        return [to for frm, to in self.legal_moves() if frm == start]
 
     def has_any_legal_moves(self, color):
         """Return True if side `color` (1 white, -1 black) has any legal moves."""
-        saved_side = self.side_to_move
-        self.side_to_move = color
-        try:
-            for r in range(8):
-                for c in range(8):
-                    if int(self.squares[r][c]) * color > 0:
-                        moves = self.get_valid_moves(r, c)
-                        if moves:
-                            return True
-            return False
-        finally:
-            self.side_to_move = saved_side
-    
-
+        entry = self._legal_cache
+        if color == self.side_to_move and entry is not None and entry[0] == (self.zobrist_key, color):
+            return bool(entry[1])
+        for _ in self.generate_legal_moves(color):
+            return True
+        return False
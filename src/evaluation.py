@@ -0,0 +1,122 @@
+# Static evaluation terms kept incrementally by Board (see Board.psq_score).
+# Tables are written from white's point of view with row 0 as the eighth
+# rank, the same layout as Board.squares; black pieces read them mirrored.
+import numpy as np
+
+PIECE_VALUES = {
+    1: 100,   # pawn
+    2: 320,   # knight
+    3: 330,   # bishop
+    4: 500,   # rook
+    5: 900,   # queen
+    6: 20000, # king
+}
+
+PAWN_TABLE = [
+      0,   0,   0,   0,   0,   0,   0,   0,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     10,  10,  20,  30,  30,  20,  10,  10,
+      5,   5,  10,  25,  25,  10,   5,   5,
+      0,   0,   0,  20,  20,   0,   0,   0,
+      5,  -5, -10,   0,   0, -10,  -5,   5,
+      5,  10,  10, -20, -20,  10,  10,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+]
+
+KNIGHT_TABLE = [
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20,   0,   0,   0,   0, -20, -40,
+    -30,   0,  10,  15,  15,  10,   0, -30,
+    -30,   5,  15,  20,  20,  15,   5, -30,
+    -30,   0,  15,  20,  20,  15,   0, -30,
+    -30,   5,  10,  15,  15,  10,   5, -30,
+    -40, -20,   0,   5,   5,   0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+]
+
+BISHOP_TABLE = [
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,  10,  10,   5,   0, -10,
+    -10,   5,   5,  10,  10,   5,   5, -10,
+    -10,   0,  10,  10,  10,  10,   0, -10,
+    -10,  10,  10,  10,  10,  10,  10, -10,
+    -10,   5,   0,   0,   0,   0,   5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+]
+
+ROOK_TABLE = [
+      0,   0,   0,   0,   0,   0,   0,   0,
+      5,  10,  10,  10,  10,  10,  10,   5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+      0,   0,   0,   5,   5,   0,   0,   0,
+]
+
+QUEEN_TABLE = [
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,   5,   5,   5,   0, -10,
+     -5,   0,   5,   5,   5,   5,   0,  -5,
+      0,   0,   5,   5,   5,   5,   0,  -5,
+    -10,   5,   5,   5,   5,   5,   0, -10,
+    -10,   0,   5,   0,   0,   0,   0, -10,
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+]
+
+# Middlegame king: stay behind the pawns, preferably castled
+KING_TABLE = [
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+     20,  20,   0,   0,   0,   0,  20,  20,
+     20,  30,  10,   0,   0,  10,  30,  20,
+]
+
+PIECE_TABLES = {
+    1: PAWN_TABLE,
+    2: KNIGHT_TABLE,
+    3: BISHOP_TABLE,
+    4: ROOK_TABLE,
+    5: QUEEN_TABLE,
+    6: KING_TABLE,
+}
+
+# PIECE_SQUARE_SCORES[piece + 6][square index]: material plus table bonus,
+# signed so white pieces count positive; row 6 (empty) stays zero
+PIECE_SQUARE_SCORES = [[0] * 64 for _ in range(13)]
+for _piece, _table in PIECE_TABLES.items():
+    for _sq in range(64):
+        PIECE_SQUARE_SCORES[_piece + 6][_sq] = PIECE_VALUES[_piece] + _table[_sq]
+        # square 56 ^ sq is the same square seen from black's side
+        PIECE_SQUARE_SCORES[-_piece + 6][_sq] = -(PIECE_VALUES[_piece] + _table[56 ^ _sq])
+
+# The same scores as an array, for scoring many positions at once
+PIECE_SQUARE_ARRAY = np.array(PIECE_SQUARE_SCORES, dtype=np.int32)
+# Flattened square-major, so square sq holding piece reads entry
+# sq * 13 + piece + 6; the offsets below add the sq * 13 + 6 part
+_FLAT_SCORES = PIECE_SQUARE_ARRAY.T.ravel()
+_SQUARE_OFFSETS = (np.arange(64) * 13 + 6).astype(np.int16)
+
+
+def evaluate_batch(squares) -> np.ndarray:
+    """
+    Material plus piece-square score of many positions, white minus black.
+
+    Gives the same numbers as Board.psq_score, but for a whole stack of
+    positions in one table lookup, e.g. for analysis and dataset jobs.
+
+    Args:
+        squares: (N, 8, 8) array of piece values, e.g. stacked Board.squares
+
+    Returns:
+        (N,) int32 array of scores
+    """
+    pieces = np.asarray(squares, dtype=np.int8).reshape(-1, 64)
+    return np.take(_FLAT_SCORES, pieces + _SQUARE_OFFSETS).sum(axis=1, dtype=np.int32)
@@ -1,10 +1,7 @@
 import sys
-import pygame
 from PyQt5.QtWidgets import QApplication
 from ui import MainWindow
 
-pygame.init()
-
 if __name__ == '__main__':
     app = QApplication(sys.argv)
 
@@ -12,4 +9,3 @@ if __name__ == '__main__':
     window.show()
 
     sys.exit(app.exec_())
-        
\ No newline at end of file
@@ -0,0 +1,204 @@
+"""
+Perft: move generation correctness and speed.
+
+Counts the leaf nodes of the legal move tree to a fixed depth from a set of
+standard positions and compares them with known counts. Also reports nodes
+per second and, with --stats, how many leaf moves were captures, en passant,
+castles, promotions and checks. Run from the repository root:
+
+    python src/perft.py                     # whole suite
+    python src/perft.py kiwipete --depth 3 --stats
+    python src/perft.py --save bench.json   # record speeds...
+    python src/perft.py --baseline bench.json   # ...and compare a later run
+"""
+import argparse
+import json
+import sys
+import time
+
+from board import Board
+
+# Board always promotes to a queen, so the counts below leave out
+# underpromotions. They equal the published numbers wherever no promotion
+# happens within the depth.
+POSITIONS = {
+    'startpos': ('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+                 [20, 400, 8902, 197281, 4865609]),
+    'kiwipete': ('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+                 [48, 2039, 97862, 4074224]),
+    'position3': ('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+                  [14, 191, 2812, 43238, 674624, 11024419]),
+    'position4': ('r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+                  [6, 228, 8087, 320802]),
+    'position5': ('rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+                  [41, 1373, 54007, 1806790]),
+    'position6': ('r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+                  [46, 2079, 89890, 3894594]),
+}
+
+# Without --depth the suite stops before depths with more nodes than this
+SUITE_NODE_LIMIT = 1000000
+
+STAT_KEYS = ('captures', 'en_passant', 'castles', 'promotions', 'checks')
+
+
+def perft(board: Board, depth: int) -> int:
+    """Number of leaf nodes of the legal move tree `depth` plies deep."""
+    if depth == 0:
+        return 1
+    moves = list(board.generate_legal_moves())
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        undo = board.make_move(move[0], move[1])
+        nodes += perft(board, depth - 1)
+        board.unmake_move(undo)
+    return nodes
+
+
+def divide(board: Board, depth: int) -> dict:
+    """Perft count below each root move, for hunting down a wrong total."""
+    counts = {}
+    for move in list(board.generate_legal_moves()):
+        undo = board.make_move(move[0], move[1])
+        counts[move] = perft(board, depth - 1)
+        board.unmake_move(undo)
+    return counts
+
+
+def perft_stats(board: Board, depth: int, stats: dict = None) -> dict:
+    """
+    Perft that also classifies the moves played at the last ply.
+
+    Returns:
+        Dict with 'nodes' and a count for every name in STAT_KEYS
+    """
+    if stats is None:
+        stats = dict.fromkeys(('nodes',) + STAT_KEYS, 0)
+    if depth == 0:
+        stats['nodes'] += 1
+        return stats
+    mailbox = board.mailbox
+    for move in list(board.generate_legal_moves()):
+        if depth == 1:
+            (fr, fc), (tr, tc) = move
+            piece = mailbox[fr * 8 + fc]
+            pawn = (piece == 1 or piece == -1)
+            if mailbox[tr * 8 + tc] != 0:
+                stats['captures'] += 1
+            elif pawn and fc != tc:
+                stats['captures'] += 1
+                stats['en_passant'] += 1
+            if (piece == 6 or piece == -6) and abs(tc - fc) == 2:
+                stats['castles'] += 1
+            if pawn and (tr == 0 or tr == 7):
+                stats['promotions'] += 1
+        undo = board.make_move(move[0], move[1])
+        if depth == 1:
+            stats['nodes'] += 1
+            if board.is_in_check(board.side_to_move):
+                stats['checks'] += 1
+        else:
+            perft_stats(board, depth - 1, stats)
+        board.unmake_move(undo)
+    return stats
+
+
+def run_suite(names, max_depth: int = None, with_stats: bool = False):
+    """
+    Run perft on the named positions, one line per depth.
+
+    Returns:
+        (results, failures): results maps name -> per-depth dicts with
+        nodes, expected, seconds and nps; failures lists mismatches
+    """
+    results = {}
+    failures = []
+    for name in names:
+        fen, expected = POSITIONS[name]
+        if max_depth is None:
+            depth_limit = sum(1 for count in expected if count <= SUITE_NODE_LIMIT)
+        else:
+            depth_limit = max_depth
+        results[name] = []
+        for depth in range(1, depth_limit + 1):
+            board = Board.from_fen(fen)
+            start = time.perf_counter()
+            if with_stats:
+                stats = perft_stats(board, depth)
+                nodes = stats['nodes']
+            else:
+                stats = None
+                nodes = perft(board, depth)
+            seconds = time.perf_counter() - start
+            known = expected[depth - 1] if depth <= len(expected) else None
+            entry = {
+                'depth': depth, 'nodes': nodes, 'expected': known,
+                'seconds': seconds, 'nps': nodes / seconds if seconds else 0.0,
+            }
+            if stats is not None:
+                entry.update((key, stats[key]) for key in STAT_KEYS)
+            results[name].append(entry)
+            if known is not None and nodes != known:
+                failures.append((name, depth, nodes, known))
+    return results, failures
+
+
+def _format_entry(name, entry, baseline):
+    known = entry['expected']
+    status = '?' if known is None else ('ok' if entry['nodes'] == known else f'FAIL (expected {known})')
+    line = (f"{name:<10} d{entry['depth']} {entry['nodes']:>9} nodes "
+            f"{entry['seconds']:>7.2f}s {entry['nps']:>9.0f} n/s  {status}")
+    if 'captures' in entry:
+        line += '  ' + ' '.join(f"{key}={entry[key]}" for key in STAT_KEYS)
+    if baseline:
+        for old in baseline.get(name, []):
+            if old['depth'] == entry['depth'] and old['nps']:
+                line += f"  {100 * (entry['nps'] / old['nps'] - 1):+.1f}% vs baseline"
+    return line
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Perft correctness and speed suite.')
+    parser.add_argument('positions', nargs='*', help=f"subset of: {', '.join(POSITIONS)}")
+    parser.add_argument('--depth', type=int, default=None,
+                        help=f'deepest depth to run (default: known counts up to {SUITE_NODE_LIMIT} nodes)')
+    parser.add_argument('--stats', action='store_true', help='break leaf moves down by kind (slower)')
+    parser.add_argument('--divide', action='store_true', help='print the count below each root move')
+    parser.add_argument('--save', help='write the results as JSON for later comparison')
+    parser.add_argument('--baseline', help='JSON from an earlier --save to compare speed against')
+    args = parser.parse_args()
+
+    names = args.positions or list(POSITIONS)
+    if args.divide:
+        depth = args.depth or 1
+        for name in names:
+            counts = divide(Board.from_fen(POSITIONS[name][0]), depth)
+            files, ranks = 'abcdefgh', '87654321'
+            for (fr, fc), (tr, tc) in sorted(counts):
+                print(f"{files[fc]}{ranks[fr]}{files[tc]}{ranks[tr]}: {counts[(fr, fc), (tr, tc)]}")
+            print(f"{name} d{depth}: {sum(counts.values())}")
+        return 0
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results, failures = run_suite(names, args.depth, args.stats)
+    for name in names:
+        for entry in results[name]:
+            print(_format_entry(name, entry, baseline))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+    if failures:
+        print(f"{len(failures)} perft mismatch(es)")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,90 +1,73 @@
-KNIGHT_MOVES = [
-    (1, 2), (1, -2), (-1, 2), (-1, -2),
-    (2, 1), (2, -1), (-2, 1), (-2, -1)
-]
-ROOK_MOVES = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-BISHOP_MOVES = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-KING_MOVES = [
-    (-1, -1), (-1, 0), (-1, 1),
-    (0, -1),           (0, 1),
-    (1, -1),  (1, 0),  (1, 1)
-]
-BISHOP_MOVES = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+from bitboard import (
+    SQUARE_COORDS, KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS,
+    rook_attacks, bishop_attacks, queen_attacks, iter_bits,
+)
 
-class Piece:
-    
-    @staticmethod
-    def get_knight_moves(board, row, col, piece_value):
-        moves = []
-               
-        for move in KNIGHT_MOVES:
-            row_change, col_change = move
-            new_row = row + row_change
-            new_col = col + col_change
-            
-            if board.is_on_board(new_row, new_col):
-                
-                target_square = board.squares[new_row][new_col]
-                
-                
-                if target_square * piece_value > 0:
-                    continue # Blocked by friend
-                # If we get here, it's empty or enemy -> Valid!
-                moves.append((new_row, new_col))
-                
-        return moves
-
-    @staticmethod
-    def get_rook_moves(board, row, col, piece_value):
-        moves = []
-
-        for move in ROOK_MOVES:
-            row_dir, col_dir = move
-            new_row = row + row_dir
-            new_col = col + col_dir
 
-            while board.is_on_board(new_row, new_col):
-                target = board.squares[new_row][new_col]
+def _to_moves(targets):
+    return [SQUARE_COORDS[sq] for sq in iter_bits(targets)]
 
-                if target == 0:
-                    moves.append((new_row, new_col))
-                    new_row += row_dir
-                    new_col += col_dir
-                    continue
 
-                
-                if target * piece_value > 0:
-                    break
+class Piece:
 
-                moves.append((new_row, new_col))
-                break
-        return moves
+    @staticmethod
+    def get_targets(board, sq, piece_value):
+        """Pseudo-legal target squares of the piece on `sq` as a bitboard (castling excluded)."""
+        piece_type = abs(piece_value)
+        color = 1 if piece_value > 0 else -1
+        if piece_type == 1:
+            return Piece.get_pawn_targets(board, sq, color)
+        if piece_type == 2:
+            attacks = KNIGHT_ATTACKS[sq]
+        elif piece_type == 3:
+            attacks = bishop_attacks(sq, board.occupied)
+        elif piece_type == 4:
+            attacks = rook_attacks(sq, board.occupied)
+        elif piece_type == 5:
+            attacks = queen_attacks(sq, board.occupied)
+        else:
+            attacks = KING_ATTACKS[sq]
+        # empty or enemy squares only; friends block
+        return attacks & ~board.occupancy[color]
 
     @staticmethod
-    def get_bishop_moves(board, row, col, piece_value):
-        moves = []
+    def get_pawn_targets(board, sq, color):
+        targets = 0
 
-        for move in BISHOP_MOVES:
-            row_dir, col_dir = move
-            new_row = row + row_dir
-            new_col = col + col_dir
+        # white (positive) moves up (row-1), black moves down (row+1)
+        step = -8 if color == 1 else 8
+        fr = sq + step
+        if 0 <= fr < 64 and not (board.occupied >> fr) & 1:
+            targets |= 1 << fr
 
-            while board.is_on_board(new_row, new_col):
-                target = board.squares[new_row][new_col]
+            # Two squares from starting rank
+            start_row = 6 if color == 1 else 1
+            fr2 = fr + step
+            if sq // 8 == start_row and not (board.occupied >> fr2) & 1:
+                targets |= 1 << fr2
+
+        # Captures, including en passant onto the (empty) target square
+        attacks = PAWN_ATTACKS[color][sq]
+        targets |= attacks & board.occupancy[-color]
+        if board.en_passant_target is not None:
+            ep_row, ep_col = board.en_passant_target
+            # the target is only capturable by the side that did not just push
+            if ep_row == (2 if color == 1 else 5):
+                targets |= attacks & (1 << (ep_row * 8 + ep_col))
 
-                if target == 0:
-                    moves.append((new_row, new_col))
-                    new_row += row_dir
-                    new_col += col_dir
-                    continue
+        return targets
 
-                if target * piece_value > 0:
-                    break
+    @staticmethod
+    def get_knight_moves(board, row, col, piece_value):
+        return _to_moves(Piece.get_targets(board, row * 8 + col, 2 if piece_value > 0 else -2))
 
-                moves.append((new_row, new_col))
-                break
+    @staticmethod
+    def get_rook_moves(board, row, col, piece_value):
+        return _to_moves(Piece.get_targets(board, row * 8 + col, 4 if piece_value > 0 else -4))
 
-        return moves
+    @staticmethod
+    def get_bishop_moves(board, row, col, piece_value):
+        return _to_moves(Piece.get_targets(board, row * 8 + col, 3 if piece_value > 0 else -3))
 
     @staticmethod
     def get_queen_moves(board, row, col, piece_value):
@@ -96,56 +79,8 @@ class Piece:
 
     @staticmethod
     def get_king_moves(board, row, col, piece_value):
-        moves = []
-
-        for d in KING_MOVES:
-            new_row = row + d[0]
-            new_col = col + d[1]
-            if not board.is_on_board(new_row, new_col):
-                continue
-            target = board.squares[new_row][new_col]
-            if target * piece_value > 0:
-                continue
-            moves.append((new_row, new_col))
-
-        return moves
+        return _to_moves(Piece.get_targets(board, row * 8 + col, 6 if piece_value > 0 else -6))
 
     @staticmethod
     def get_pawn_moves(board, row, col, piece_value):
-        moves = []
-
-        # white (positive) moves up (row-1), black moves down (row+1)
-        direction = -1 if piece_value > 0 else 1
-
-        
-        fr = row + direction
-        if board.is_on_board(fr, col) and int(board.squares[fr][col]) == 0:
-            moves.append((fr, col))
-
-            # Two squares from starting rank
-            start_row = 6 if piece_value > 0 else 1
-            fr2 = row + 2 * direction
-            if row == start_row and board.is_on_board(fr2, col) and int(board.squares[fr2][col]) == 0:
-                moves.append((fr2, col))
-
-        # Captures
-        for dc in (-1, 1):
-            cr = row + direction
-            cc = col + dc
-            if board.is_on_board(cr, cc):
-                target = int(board.squares[cr][cc])
-                if target * piece_value < 0:
-                    moves.append((cr, cc))
-                # En-passant: target square may be empty but equal to board.en_passant_target
-                elif hasattr(board, 'en_passant_target') and board.en_passant_target == (cr, cc):
-                    moves.append((cr, cc))
-
-        # If there is an en_passant_target and it is reachable by a diagonal capture
-        if board.en_passant_target:
-            ep_row, ep_col = board.en_passant_target
-            # Check if the target is diagonally in front of the pawn
-            if ep_row == row + direction and abs(ep_col - col) == 1:
-                moves.append((ep_row, ep_col))
-        
-        
-        return moves
+        return _to_moves(Piece.get_pawn_targets(board, row * 8 + col, 1 if piece_value > 0 else -1))
@@ -0,0 +1,303 @@
+"""
+Headless bot-vs-bot tournaments.
+
+Plays a match between two bots from models/bot.py across a process pool,
+without the GUI. Games come in pairs that start from the same randomized
+opening with colors swapped. Each finished game is appended to a PGN file
+and a JSON-lines results file as soon as it finishes. Run from the
+repository root:
+
+    python src/tournament.py alphabeta random --games 100 --workers 4 --pgn data/match.pgn
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from board import Board
+from evaluation import PIECE_VALUES
+from models.bot import AlphaBetaBot, RandomBot, AggressiveBot, CautiousBot, TacticalBot
+
+BOT_TYPES = {
+    'alphabeta': AlphaBetaBot,
+    'random': RandomBot,
+    'aggressive': AggressiveBot,
+    'cautious': CautiousBot,
+    'tactical': TacticalBot,
+}
+
+# Adjudication defaults
+MAX_PLIES = 300             # draw once a game reaches this many plies
+WIN_MARGIN = 1000           # material lead that counts as decisive...
+WIN_PLIES = 10              # ...once held this many plies in a row
+
+
+def make_bot(bot_type: str, color: int, depth: int = 3, move_time_ms: int = None,
+             tablebase_path: str = None):
+    """Create a bot by its name in BOT_TYPES."""
+    bot_class = BOT_TYPES[bot_type]
+    if issubclass(bot_class, AlphaBetaBot):
+        return bot_class(color=color, depth=depth, move_time_ms=move_time_ms,
+                         tablebase_path=tablebase_path)
+    return bot_class(color=color, depth=depth)
+
+
+def _material(board: Board) -> int:
+    """Material balance without kings, white minus black."""
+    return sum(value * (board.piece_count(piece) - board.piece_count(-piece))
+               for piece, value in PIECE_VALUES.items() if piece != 6)
+
+
+def _insufficient_material(board: Board) -> bool:
+    """Bare kings, or a king and one minor piece against a bare king."""
+    for piece in (1, 4, 5):
+        if board.piece_count(piece) or board.piece_count(-piece):
+            return False
+    minors = sum(board.piece_count(p) for p in (2, 3, -2, -3))
+    return minors <= 1
+
+
+def _random_opening(board: Board, plies: int, rng: random.Random):
+    """Play `plies` random legal moves; returns them (fewer if the game ends)."""
+    moves = []
+    for _ in range(plies):
+        legal = sorted(board.generate_legal_moves())
+        if not legal:
+            break
+        move = rng.choice(legal)
+        board.move_piece(*move)
+        moves.append(move)
+    return moves
+
+
+def _game_result(board: Board, plies: int, lead_plies: int, lead_color: int,
+                 max_plies: int, win_plies: int):
+    """Return (result, termination) once the game is decided, else None."""
+    side = board.side_to_move
+    if not board.has_any_legal_moves(side):
+        if board.is_in_check(side):
+            return ('1-0' if side == -1 else '0-1'), 'checkmate'
+        return '1/2-1/2', 'stalemate'
+    if board.is_threefold_repetition():
+        return '1/2-1/2', 'threefold repetition'
+    if board.is_fifty_move_rule():
+        return '1/2-1/2', 'fifty-move rule'
+    if _insufficient_material(board):
+        return '1/2-1/2', 'insufficient material'
+    if win_plies and lead_plies >= win_plies:
+        return ('1-0' if lead_color == 1 else '0-1'), 'adjudicated on material'
+    if plies >= max_plies:
+        return '1/2-1/2', 'adjudicated on move limit'
+    return None
+
+
+def build_pgn(moves, white_name: str, black_name: str, result: str, termination: str,
+              round_number: int = 1, start_fen: str = None):
+    """PGN text of a game given as board moves from start_fen (default: the start position)."""
+    import chess
+    import chess.pgn
+
+    game = chess.pgn.Game()
+    if start_fen:
+        game.setup(Board.from_fen(start_fen).to_fen())  # drops EPD operations
+    game.headers["Event"] = "Py-chess tournament"
+    game.headers["Site"] = "headless"
+    game.headers["Date"] = datetime.now().strftime('%Y.%m.%d')
+    game.headers["Round"] = str(round_number)
+    game.headers["White"] = white_name
+    game.headers["Black"] = black_name
+    game.headers["Result"] = result
+    game.headers["Termination"] = termination
+
+    board = game.board()
+    node = game
+    files = 'abcdefgh'
+    ranks = '87654321'
+    for (sr, sc), (fr, fc) in moves:
+        uci = files[sc] + ranks[sr] + files[fc] + ranks[fr]
+        piece = board.piece_at(chess.parse_square(uci[:2]))
+        if piece and piece.piece_type == chess.PAWN and uci[3] in ('8', '1'):
+            uci += 'q'  # Board always promotes to a queen
+        move = chess.Move.from_uci(uci)
+        node = node.add_variation(move)
+        board.push(move)
+
+    exporter = chess.pgn.StringExporter(headers=True, variations=False, comments=False, columns=80)
+    return game.accept(exporter).strip()
+
+
+def play_game(white: tuple, black: tuple, opening_plies: int = 0, seed: int = 0,
+              max_plies: int = MAX_PLIES, win_margin: int = WIN_MARGIN,
+              win_plies: int = WIN_PLIES, move_time_ms: int = None, start_fen: str = None,
+              tablebase_path: str = None):
+    """
+    Play one game between two bots.
+
+    Args:
+        white: (bot type, depth) for white
+        black: (bot type, depth) for black
+        opening_plies: random moves played before the bots take over
+        seed: seeds the opening and any randomness in the bots
+        max_plies: draw adjudication limit
+        win_margin: material lead (centipawns) that decides the game...
+        win_plies: ...when held this many plies in a row; 0 disables it
+        move_time_ms: per-move budget for alpha-beta bots, None for fixed depth
+        start_fen: position to start from instead of the initial one
+        tablebase_path: Syzygy directory for alpha-beta bots
+
+    Returns:
+        Dict with the result, termination reason and the moves played
+    """
+    rng = random.Random(seed)
+    random.seed(seed)  # RandomBot draws from the global generator
+    board = Board.from_fen(start_fen) if start_fen else Board()
+    moves = _random_opening(board, opening_plies, rng)
+    bots = {
+        1: make_bot(white[0], 1, white[1], move_time_ms, tablebase_path),
+        -1: make_bot(black[0], -1, black[1], move_time_ms, tablebase_path),
+    }
+
+    lead_plies = 0
+    lead_color = 0
+    while True:
+        material = _material(board)
+        color = 1 if material > 0 else -1
+        if abs(material) >= win_margin:
+            lead_plies = lead_plies + 1 if color == lead_color else 1
+            lead_color = color
+        else:
+            lead_plies = 0
+            lead_color = 0
+
+        outcome = _game_result(board, len(moves), lead_plies, lead_color, max_plies, win_plies)
+        if outcome is not None:
+            break
+        move = bots[board.side_to_move].get_move(board)
+        if move is None:
+            outcome = ('0-1' if board.side_to_move == 1 else '1-0'), 'no move returned'
+            break
+        board.move_piece(*move)
+        moves.append(move)
+
+    for bot in bots.values():
+        if hasattr(bot, 'close'):
+            bot.close()
+    result, termination = outcome
+    return {'result': result, 'termination': termination, 'plies': len(moves), 'moves': moves}
+
+
+def _play_numbered(index, white, black, kwargs):
+    """Pool task: play_game tagged with its game number and players."""
+    game = play_game(white, black, **kwargs)
+    game['index'] = index
+    game['start_fen'] = kwargs.get('start_fen')
+    game['a_is_white'] = (index % 2 == 0)
+    game['white'] = f"{white[0]} d{white[1]}"
+    game['black'] = f"{black[0]} d{black[1]}"
+    return game
+
+
+def run_tournament(bot_a: tuple, bot_b: tuple, games: int, workers: int = None,
+                   opening_plies: int = 4, seed: int = 0, pgn_path: str = None,
+                   results_path: str = None, start_fens=None, **kwargs):
+    """
+    Play `games` games between two bots and yield each one as it finishes.
+
+    Game 2k has bot_a as white, game 2k+1 swaps colors on the same opening.
+    Finished games are appended to pgn_path and, as JSON lines without the
+    move list, to results_path.
+
+    Args:
+        bot_a, bot_b: (bot type, depth) tuples
+        games: number of games
+        workers: worker processes (default: one per CPU)
+        opening_plies: random plies played before the bots take over
+        seed: base seed; a pair of games shares seed + pair number
+        start_fens: start positions (FEN or EPD), used in turn by each pair
+        kwargs: passed on to play_game (max_plies, win_margin, ...)
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for index in range(games):
+            white, black = (bot_a, bot_b) if index % 2 == 0 else (bot_b, bot_a)
+            game_kwargs = dict(kwargs, opening_plies=opening_plies, seed=seed + index // 2)
+            if start_fens:
+                game_kwargs['start_fen'] = start_fens[index // 2 % len(start_fens)]
+            futures.append(pool.submit(_play_numbered, index, white, black, game_kwargs))
+
+        for future in as_completed(futures):
+            game = future.result()
+            if pgn_path:
+                pgn = build_pgn(game['moves'], game['white'], game['black'], game['result'],
+                                game['termination'], game['index'] + 1, game['start_fen'])
+                with open(pgn_path, 'a') as f:
+                    f.write(pgn + '\n\n')
+            if results_path:
+                record = {k: v for k, v in game.items() if k != 'moves'}
+                with open(results_path, 'a') as f:
+                    f.write(json.dumps(record) + '\n')
+            yield game
+
+
+def score_a(game: dict) -> float:
+    """Points bot_a of run_tournament scored in a finished game."""
+    if game['result'] == '1/2-1/2':
+        return 0.5
+    white_won = (game['result'] == '1-0')
+    return 1.0 if white_won == game['a_is_white'] else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless bot-vs-bot match.')
+    parser.add_argument('bot_a', choices=sorted(BOT_TYPES))
+    parser.add_argument('bot_b', choices=sorted(BOT_TYPES))
+    parser.add_argument('--depth-a', type=int, default=3)
+    parser.add_argument('--depth-b', type=int, default=3)
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=None, help='default: one per CPU')
+    parser.add_argument('--opening-plies', type=int, default=4, help='random plies before the bots play')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--move-ms', type=int, default=None, help='per-move budget for alpha-beta bots')
+    parser.add_argument('--max-plies', type=int, default=MAX_PLIES)
+    parser.add_argument('--win-margin', type=int, default=WIN_MARGIN)
+    parser.add_argument('--win-plies', type=int, default=WIN_PLIES, help='0 disables material adjudication')
+    parser.add_argument('--openings', default=None, help='file of FEN/EPD start positions, one per line')
+    parser.add_argument('--syzygy', default=None, help='Syzygy tablebase directory for alpha-beta bots')
+    parser.add_argument('--pgn', default=None, help='append finished games to this PGN file')
+    parser.add_argument('--results', default=None, help='append results to this JSON-lines file')
+    args = parser.parse_args()
+
+    start_fens = None
+    if args.openings:
+        with open(args.openings) as f:
+            start_fens = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    bot_a = (args.bot_a, args.depth_a)
+    bot_b = (args.bot_b, args.depth_b)
+    name_a = f"{bot_a[0]} d{bot_a[1]}"
+    name_b = f"{bot_b[0]} d{bot_b[1]}"
+
+    points = 0.0
+    played = 0
+    for game in run_tournament(bot_a, bot_b, args.games, args.workers, args.opening_plies,
+                               args.seed, args.pgn, args.results, start_fens, max_plies=args.max_plies,
+                               win_margin=args.win_margin, win_plies=args.win_plies,
+                               move_time_ms=args.move_ms, tablebase_path=args.syzygy):
+        played += 1
+        points += score_a(game)
+        print(f"game {game['index'] + 1}: {game['white']} - {game['black']} {game['result']} "
+              f"({game['termination']}, {game['plies']} plies)  "
+              f"{name_a} {points:g}/{played}", flush=True)
+
+    print(f"{name_a} vs {name_b}: {points:g}/{played}")
+
+
+if __name__ == '__main__':
+    main()
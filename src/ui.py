@@ -1,6 +1,6 @@
-import pygame
 import sys
 import os
+import traceback
 
 # Add parent directory to path so we can import models BEFORE other imports
 ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
@@ -12,11 +12,38 @@ from PyQt5.QtWidgets import (
     QListWidget, QSplitter, QDialog,
     QPushButton, QMessageBox, QStackedWidget
 )
-from PyQt5.QtCore import Qt, QTimer, QSize, pyqtSignal
-from PyQt5.QtGui import QPixmap, QImage, QFont
+from PyQt5.QtCore import Qt, QTimer, QSize, QThread, pyqtSignal
+from PyQt5.QtGui import QPixmap, QFont, QPainter, QColor, QPen
 import random
 from board import Board
-from models.bot import AlphaBetaBot, RandomBot, AggressiveBot, CautiousBot, TacticalBot
+from models.bot import AlphaBetaBot, RandomBot, AggressiveBot, CautiousBot, TacticalBot, move_time_budget
+
+PIECES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'assets', 'images', 'pieces')
+PIECE_NAMES = {1: "pawn", 2: "knight", 3: "bishop", 4: "rook", 5: "queen", 6: "king"}
+
+# Piece images shared by every BoardWidget: decoded once per piece and
+# scaled once per (piece, size)
+_piece_images = {}
+_piece_pixmaps = {}
+
+
+def piece_pixmap(piece: int, size: int):
+    """Image of a piece (1..6 white, -1..-6 black) scaled to size x size, or None if missing."""
+    key = (piece, size)
+    if key not in _piece_pixmaps:
+        if piece not in _piece_images:
+            suffix = "l" if piece > 0 else "d"
+            filename = f"{PIECE_NAMES[abs(piece)]}_{suffix}.png"
+            image = QPixmap(os.path.join(PIECES_DIR, filename))
+            if image.isNull():
+                print(f"Warning: Could not load {filename}")
+                image = None
+            _piece_images[piece] = image
+        image = _piece_images[piece]
+        _piece_pixmaps[key] = None if image is None else image.scaled(
+            size, size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    return _piece_pixmaps[key]
 
 
 class ColorSelectionDialog(QDialog):
@@ -281,7 +308,39 @@ class StartScreenWidget(QWidget):
         self._emit_selection()
         
     
+class BotSearchThread(QThread):
+    """Runs one bot search off the GUI thread, on a private copy of the board."""
+    move_found = pyqtSignal(object)
+    # The search raised; carries a one-line description of the error
+    search_failed = pyqtSignal(str)
+
+    def __init__(self, bot, board, parent=None):
+        super().__init__(parent)
+        self.bot = bot
+        self.board = board
+        # cleared here, before the thread runs, so an early cancel sticks
+        bot.clear_stop()
+
+    def run(self):
+        try:
+            move = self.bot.get_move(self.board)
+        except Exception as exc:
+            traceback.print_exc()
+            self.search_failed.emit(f"{type(exc).__name__}: {exc}")
+            return
+        self.move_found.emit(move)
+
+
 class BoardWidget(QWidget):   
+    # A move was played on the board (by the player or a bot)
+    move_made = pyqtSignal(object)
+    # The game just ended; carries the result message
+    game_ended = pyqtSignal(str)
+
+    # Player vs bot searches deepen until their time budget runs out
+    PLAYER_BOT_MAX_DEPTH = 20
+    PLAYER_BOT_MOVE_MS = 1000  # per-move budget when no clock is running
+
     def __init__(self, parent=None, player_color=1):
         super().__init__(parent)
         self.board = Board()
@@ -326,14 +385,22 @@ class BoardWidget(QWidget):
         self.black_bot_type = 'alphabeta'
         self.white_bot = None  # Will be created when game starts
         self.black_bot = None
+        # Worker thread of the bot search in progress, if any
+        self.search_thread = None
 
         # Bot move highlight (visual feedback)
         self.last_move_from = None
         self.last_move_to = None
         self.highlight_timer = None
 
-        # Pygame surface for rendering
-        self.pygame_surface = pygame.Surface((self.width, self.height))
+        # Render layers: squares (redrawn only when the view flips), pieces
+        # (redrawn square by square as the board changes); highlights and
+        # move dots are painted over them on every paint
+        self._board_layer = None
+        self._board_layer_flipped = None
+        self._piece_layer = None
+        self._piece_layer_flipped = None
+        self._drawn_mailbox = [0] * 64
 
         self.setMinimumSize(QSize(self.width, self.height))
         self.setMaximumSize(QSize(self.width, self.height))
@@ -360,89 +427,105 @@ class BoardWidget(QWidget):
     def load_assets(self, square_size):
         
         assets = {}
-        piece_names = {
-            1: "pawn", 2: "knight", 3: "bishop", 
-            4: "rook", 5: "queen", 6: "king"
-        }
-        
-        for piece_type, name in piece_names.items():
-            for color_val in [1, -1]:
-                key = piece_type * color_val
-                suffix = "l" if color_val > 0 else "d"
-                filename = f"{name}_{suffix}.png"
-                
-                try:
-                    img = pygame.image.load(f"assets/images/pieces/{filename}")
-                    img = pygame.transform.smoothscale(img, (square_size, square_size))
+        for piece_type in PIECE_NAMES:
+            for key in (piece_type, -piece_type):
+                img = piece_pixmap(key, square_size)
+                if img is not None:
                     assets[key] = img
-                except Exception:
-                    print(f"Warning: Could not load {filename}")
-        
         return assets
     
-    def paintEvent(self, event):
+    def _square_rect(self, row, col):
+        """Widget (x, y) of a board square's top-left corner in the current view."""
+        display_row = (7 - row) if self.board_flipped else row
+        display_col = (7 - col) if self.board_flipped else col
+        return display_col * self.square_size, display_row * self.square_size
+
+    def _update_board_layer(self):
+        if self._board_layer is not None and self._board_layer_flipped == self.board_flipped:
+            return
+        layer = QPixmap(self.width, self.height)
+        painter = QPainter(layer)
+        light = QColor(*self.light_color)
+        dark = QColor(*self.dark_color)
+        size = self.square_size
         for row in range(8):
             for col in range(8):
-                # Apply board flip transformation
-                display_row = (7 - row) if self.board_flipped else row
-                display_col = (7 - col) if self.board_flipped else col
-                
-                color = self.light_color if (display_row + display_col) % 2 == 0 else self.dark_color
-                pygame.draw.rect(self.pygame_surface, color, 
-                               (display_col * self.square_size, display_row * self.square_size, 
-                                self.square_size, self.square_size))
-                
-                piece_value = self.board.squares[row][col]
-                if piece_value != 0 and int(piece_value) in self.assets:
-                    texture = self.assets[int(piece_value)]
-                    self.pygame_surface.blit(texture, 
-                                           (display_col * self.square_size, display_row * self.square_size))
-        
-        
+                # square colors are symmetric under the flip
+                painter.fillRect(col * size, row * size, size, size,
+                                 light if (row + col) % 2 == 0 else dark)
+        painter.end()
+        self._board_layer = layer
+        self._board_layer_flipped = self.board_flipped
+
+    def _update_piece_layer(self):
+        """Redraw the pieces on squares that changed since the last paint."""
+        mailbox = self.board.mailbox
+        drawn = self._drawn_mailbox
+        if self._piece_layer is None or self._piece_layer_flipped != self.board_flipped:
+            self._piece_layer = QPixmap(self.width, self.height)
+            self._piece_layer.fill(Qt.transparent)
+            self._piece_layer_flipped = self.board_flipped
+            drawn[:] = [0] * 64
+            changed = [sq for sq in range(64) if mailbox[sq]]
+        elif mailbox == drawn:
+            return
+        else:
+            changed = [sq for sq in range(64) if mailbox[sq] != drawn[sq]]
+
+        size = self.square_size
+        painter = QPainter(self._piece_layer)
+        for sq in changed:
+            x, y = self._square_rect(*divmod(sq, 8))
+            if drawn[sq]:
+                painter.setCompositionMode(QPainter.CompositionMode_Clear)
+                painter.fillRect(x, y, size, size, Qt.transparent)
+                painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+            texture = self.assets.get(mailbox[sq])
+            if texture is not None:
+                painter.drawPixmap(x, y, texture)
+            drawn[sq] = mailbox[sq]
+        painter.end()
+
+    def paintEvent(self, event):
+        self._update_board_layer()
+        self._update_piece_layer()
+
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._board_layer)
+        painter.drawPixmap(0, 0, self._piece_layer)
+        size = self.square_size
+
         # Highlight bot's last move
         if self.last_move_from and self.last_move_to:
+            painter.setPen(QPen(QColor(255, 255, 0), 3))
+            painter.setBrush(Qt.NoBrush)
             for row, col in [self.last_move_from, self.last_move_to]:
-                display_row = (7 - row) if self.board_flipped else row
-                display_col = (7 - col) if self.board_flipped else col
-                pygame.draw.rect(self.pygame_surface, (255, 255, 0),
-                               (display_col * self.square_size, display_row * self.square_size,
-                                self.square_size, self.square_size), 3)
-        
+                x, y = self._square_rect(row, col)
+                painter.drawRect(x + 1, y + 1, size - 3, size - 3)
+
         if self.valid_moves and not self.game_over:
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(100, 200, 100))
             for move_row, move_col in self.valid_moves:
-                display_row = (7 - move_row) if self.board_flipped else move_row
-                display_col = (7 - move_col) if self.board_flipped else move_col
-                
-                center_x = display_col * self.square_size + self.square_size // 2
-                center_y = display_row * self.square_size + self.square_size // 2
-                pygame.draw.circle(self.pygame_surface, (100, 200, 100), (center_x, center_y), 8)
-        
-        
+                x, y = self._square_rect(move_row, move_col)
+                painter.drawEllipse(x + size // 2 - 8, y + size // 2 - 8, 16, 16)
+
         if self.game_over and self.result_msg:
-            font = pygame.font.SysFont(None, max(24, self.square_size // 2))
-            text_surf = font.render(self.result_msg, True, (255, 0, 0))
-            text_rect = text_surf.get_rect(center=(self.width // 2, self.height // 2))
-            self.pygame_surface.blit(text_surf, text_rect)
-        
-        # Convert pygame surface to QPixmap
-        pygame_data = pygame.image.tostring(self.pygame_surface, "RGB", False)
-        qimg = QImage(pygame_data, self.width, self.height, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(qimg)
-        
-        # Draw on widget
-        painter = event.painter() if hasattr(event, 'painter') else None
-        if painter:
-            painter.drawPixmap(0, 0, pixmap)
-        else:
-            from PyQt5.QtGui import QPainter
-            painter = QPainter(self)
-            painter.drawPixmap(0, 0, pixmap)
-            painter.end()
+            font = QFont()
+            font.setPixelSize(max(24, size // 2) * 3 // 4)
+            painter.setFont(font)
+            painter.setPen(QColor(255, 0, 0))
+            painter.drawText(0, 0, self.width, self.height, Qt.AlignCenter, self.result_msg)
+        painter.end()
     
     def mousePressEvent(self, event):
         
         if self.game_over:
             return
+        # the bot's pieces stay put while it is thinking
+        if self.bot_vs_bot or (self.player_vs_bot and self.board.side_to_move != self.player_color):
+            return
         
         x = event.x()
         y = event.y()
@@ -489,19 +572,17 @@ class BoardWidget(QWidget):
                 
                 # Check for draws first (repetition and fifty-move rule)
                 if self.board.is_fifty_move_rule():
-                    self.result_msg = 'Draw (fifty-move rule)'
-                    self.game_over = True
+                    self.end_game('Draw (fifty-move rule)')
                 elif self._is_simple_repetition():
-                    self.result_msg = 'Draw (repetition loop)'
-                    self.game_over = True
+                    self.end_game('Draw (repetition loop)')
                 # Check for mate/stalemate
-                elif not self.board.has_any_legal_moves(self.board.side_to_move):
-                    if self.board.is_in_check(self.board.side_to_move):
+                elif not self.board.legal_moves():
+                    if self.board.in_check():
                         winner = 'White' if self.board.side_to_move == -1 else 'Black'
-                        self.result_msg = f"{winner} wins by checkmate"
+                        self.end_game(f"{winner} wins by checkmate")
                     else:
-                        self.result_msg = 'Draw (stalemate)'
-                    self.game_over = True
+                        self.end_game('Draw (stalemate)')
+                self.move_made.emit(self.moves[-1])
                 # Auto-rotate board view for PvP games after each successful move
                 if self.auto_rotate:
                     self.board_flipped = not self.board_flipped
@@ -516,9 +597,9 @@ class BoardWidget(QWidget):
         self.valid_moves = []
         self.update()
     
-    def _execute_bot_move(self):
-        """Actually execute the bot's chosen move (called after visual delay)."""
-        if self.game_over:
+    def _start_bot_search(self):
+        """Start the bot's search on a worker thread (called after visual delay)."""
+        if self.game_over or self.search_thread is not None:
             return
 
         if self.player_vs_bot:
@@ -533,17 +614,37 @@ class BoardWidget(QWidget):
 
         # Use the appropriate bot based on whose turn it is
         if self.bot_vs_bot:
-            if self.board.side_to_move == 1:
-                move = self.white_bot.get_move(self.board)
-            else:
-                move = self.black_bot.get_move(self.board)
+            bot = self.white_bot if self.board.side_to_move == 1 else self.black_bot
         else:
-            # Player vs bot: create a new bot for player's opponent with depth 1
-            bot_type = getattr(self, 'player_bot_type', 'alphabeta')
-            bot = self._create_bot(bot_type, self.board.side_to_move, 1)
-            move = bot.get_move(self.board)
-        
-        if move is None:
+            # Player vs bot: keep one bot per game so its search tables
+            # carry over from move to move, and let the clock set its depth
+            bot = getattr(self, 'player_bot', None)
+            if bot is None or bot.color != self.board.side_to_move:
+                bot_type = getattr(self, 'player_bot_type', 'alphabeta')
+                bot = self._create_bot(bot_type, self.board.side_to_move, self.PLAYER_BOT_MAX_DEPTH)
+                self.player_bot = bot
+            bot.move_time_ms = self._bot_move_time_ms(bot.color)
+
+        thread = BotSearchThread(bot, self.board.copy(), self)
+        thread.move_found.connect(self._execute_bot_move)
+        thread.search_failed.connect(self._on_bot_search_failed)
+        thread.finished.connect(thread.deleteLater)
+        self.search_thread = thread
+        thread.start()
+
+    def _on_bot_search_failed(self, error):
+        """The bot could not produce a move; end the game and say why."""
+        if self.sender() is not self.search_thread:
+            return  # a cancelled search
+        self.search_thread = None
+        self.end_game(f"Bot error ({error})")
+
+    def _execute_bot_move(self, move):
+        """Play the move found by the bot search."""
+        if self.sender() is not self.search_thread:
+            return  # result of a cancelled search
+        self.search_thread = None
+        if move is None or self.game_over:
             return
 
         (sr, sc), (fr, fc) = move
@@ -582,18 +683,15 @@ class BoardWidget(QWidget):
 
         # Check for draws first (repetition and fifty-move rule)
         if self.board.is_fifty_move_rule():
-            self.result_msg = 'Draw (fifty-move rule)'
-            self.game_over = True
+            self.end_game('Draw (fifty-move rule)')
         elif self._is_simple_repetition():
-            self.result_msg = 'Draw (repetition loop)'
-            self.game_over = True
-        elif not self.board.has_any_legal_moves(self.board.side_to_move):
-            if self.board.is_in_check(self.board.side_to_move):
+            self.end_game('Draw (repetition loop)')
+        elif not self.board.legal_moves():
+            if self.board.in_check():
                 winner = 'White' if self.board.side_to_move == -1 else 'Black'
-                self.result_msg = f"{winner} wins by checkmate"
+                self.end_game(f"{winner} wins by checkmate")
             else:
-                self.result_msg = 'Draw (stalemate)'
-            self.game_over = True
+                self.end_game('Draw (stalemate)')
         else:
             # Clear highlight after 1 second
             if self.highlight_timer:
@@ -605,19 +703,45 @@ class BoardWidget(QWidget):
             
             # Continue bot vs bot automatically with 0,1 second delay
             if self.bot_vs_bot and not self.game_over:
-                QTimer.singleShot(100, self._execute_bot_move)
+                QTimer.singleShot(100, self._start_bot_search)
 
+        self.move_made.emit(move)
         self.update()
 
+    def _bot_move_time_ms(self, color):
+        """Per-move time budget for a bot, taken from the game clock when one is running."""
+        window = self.window()
+        remaining = getattr(window, 'white_time' if color == 1 else 'black_time', None)
+        if remaining is None:
+            return self.PLAYER_BOT_MOVE_MS
+        return move_time_budget(remaining)
+
     def make_bot_move(self, depth=3):
-        """Defer bot move to next event loop to avoid blocking UI."""
+        """Let the bot move after a short delay; the search runs on a worker thread."""
         if self.game_over:
             return
         if not (self.player_vs_bot or self.bot_vs_bot):
             return
         
-        # Schedule bot move on the event loop to keep UI responsive
-        QTimer.singleShot(100, self._execute_bot_move)
+        QTimer.singleShot(100, self._start_bot_search)
+
+    def cancel_bot_search(self, wait=False):
+        """Stop the running bot search, if any, and drop its result."""
+        thread = self.search_thread
+        if thread is None:
+            return
+        self.search_thread = None
+        thread.bot.stop()
+        if wait:
+            thread.wait()
+
+    def end_game(self, result_msg: str):
+        """Mark the game as finished and tell listeners once."""
+        if self.game_over:
+            return
+        self.game_over = True
+        self.result_msg = result_msg
+        self.game_ended.emit(result_msg)
 
     def _clear_move_highlight(self):
         """Clear the bot move highlight."""
@@ -626,7 +750,9 @@ class BoardWidget(QWidget):
         self.update()
 
     def reset_game(self):
+        self.cancel_bot_search()
         self.board = Board()
+        self.player_bot = None
         self.dragging = False
         self.game_over = False
         self.result_msg = None
@@ -648,6 +774,8 @@ class BoardWidget(QWidget):
 
 
 class MainWindow(QMainWindow):
+    # The remaining time of either side changed
+    clock_changed = pyqtSignal()
    
     def __init__(self, player_color=1):
         super().__init__()
@@ -724,9 +852,11 @@ class MainWindow(QMainWindow):
         self.load_stylesheet()
         
         
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_game_state)
-        self.update_timer.start(100)
+        # State shown next to the board follows the board's signals; the
+        # game-over dialog is queued so it opens after the move has finished
+        self.board_widget.move_made.connect(self._on_move_made)
+        self.board_widget.game_ended.connect(self._on_game_ended, Qt.QueuedConnection)
+        self.clock_changed.connect(self._update_clock_labels)
 
         
         self.white_time = None
@@ -774,6 +904,7 @@ class MainWindow(QMainWindow):
     def new_game(self):
         if self.clock_timer.isActive():
             self.clock_timer.stop()
+        self.board_widget.cancel_bot_search()
         self.board_widget.hide()
         self.stacked.setCurrentWidget(self.start_screen)
         self.statusBar().showMessage('New game - choose options')
@@ -1058,21 +1189,24 @@ class MainWindow(QMainWindow):
     
     def show_about(self):
         
-        self.statusBar().showMessage('Py-Chess - A simple chess game built with PyQt5 and Pygame')
+        self.statusBar().showMessage('Py-Chess - A simple chess game built with PyQt5')
     
-    def update_game_state(self):
-        
+    def _on_move_made(self, move):
         self.update_turn_label()
         self.update_move_history()
-        
-        if self.board_widget.game_over and not self._game_over_shown:
-            self._game_over_shown = True
-            msg = self.board_widget.result_msg or 'Game over'
-            if self.board_widget.player_vs_bot or self.board_widget.bot_vs_bot:
-                self._save_game_to_pgn(auto=True)
-            QMessageBox.information(self, 'Game Over', msg)
-            # After acknowledging, go back to start screen
-            self.new_game()
+
+    def _on_game_ended(self, msg):
+        # a dialog left over from a game that was already abandoned
+        if not self.board_widget.game_over or self._game_over_shown:
+            return
+        self._game_over_shown = True
+        if self.clock_timer.isActive():
+            self.clock_timer.stop()
+        if self.board_widget.player_vs_bot or self.board_widget.bot_vs_bot:
+            self._save_game_to_pgn(auto=True)
+        QMessageBox.information(self, 'Game Over', msg)
+        # After acknowledging, go back to start screen
+        self.new_game()
 
     def _format_time(self, seconds):
         if seconds is None:
@@ -1098,17 +1232,19 @@ class MainWindow(QMainWindow):
             if self.white_time <= 0:
                 self.white_time = 0
                 self.clock_timer.stop()
-                self.board_widget.game_over = True
-                self.board_widget.result_msg = 'Black wins on time'
+                self.board_widget.cancel_bot_search()
+                self.board_widget.end_game('Black wins on time')
         else:
             self.black_time -= 1
             if self.black_time <= 0:
                 self.black_time = 0
                 self.clock_timer.stop()
-                self.board_widget.game_over = True
-                self.board_widget.result_msg = 'White wins on time'
+                self.board_widget.cancel_bot_search()
+                self.board_widget.end_game('White wins on time')
 
-        
+        self.clock_changed.emit()
+
+    def _update_clock_labels(self):
         self.white_timer_label.setText(f'White: {self._format_time(self.white_time)}')
         self.black_timer_label.setText(f'Black: {self._format_time(self.black_time)}')
 
@@ -1119,6 +1255,7 @@ class MainWindow(QMainWindow):
                 self.clock_timer.stop()
         except Exception:
             pass
+        self.board_widget.cancel_bot_search(wait=True)
         return super().closeEvent(event)
 
     def show_color_dialog(self):
@@ -1166,5 +1303,5 @@ class MainWindow(QMainWindow):
     def update_turn_label(self):
         
         color = 'White' if self.board_widget.board.side_to_move == 1 else 'Black'
-        in_check = ' (Check!)' if self.board_widget.board.is_in_check(self.board_widget.board.side_to_move) else ''
+        in_check = ' (Check!)' if self.board_widget.board.in_check() else ''
         self.turn_label.setText(f'{color} to move{in_check}')
@@ -0,0 +1,17 @@
+# Zobrist keys for Board. Seeded so every process (bot workers, tournament
+# runners) derives the same keys and hashes can be shared between them.
+import random
+
+_rng = random.Random(0x5EED)
+
+# PIECE_KEYS[piece + 6][square index]; row 6 (empty) stays zero
+PIECE_KEYS = [
+    [0] * 64 if piece == 0 else [_rng.getrandbits(64) for _ in range(64)]
+    for piece in range(-6, 7)
+]
+# XORed in while black is to move
+SIDE_KEY = _rng.getrandbits(64)
+# Indexed by the 4-bit castling rights mask (see Board._castling_rights)
+CASTLING_KEYS = [0] + [_rng.getrandbits(64) for _ in range(15)]
+# Indexed by the column of the en passant target
+EP_KEYS = [_rng.getrandbits(64) for _ in range(8)]
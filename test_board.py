@@ -0,0 +1,300 @@
+"""Board tests: make/unmake, Zobrist keys, repetition and legal move generation"""
+
+import os
+import random
+import sys
+
+ROOT_DIR = os.path.dirname(__file__)
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from board import Board
+
+
+def _state(board):
+    return (
+        list(board.mailbox),
+        list(board.bitboards),
+        dict(board.occupancy),
+        board.occupied,
+        board._castling_flags(),
+        board.en_passant_target,
+        board.side_to_move,
+        board.moves_since_capture_or_pawn,
+        board.fullmove_number,
+        list(board.move_history),
+        board.zobrist_key,
+        board.psq_score,
+    )
+
+
+def _legal_moves(board):
+    moves = []
+    for r in range(8):
+        for c in range(8):
+            for mv in board.get_valid_moves(r, c):
+                moves.append(((r, c), mv))
+    return moves
+
+
+def test_make_unmake_restores_position():
+    rng = random.Random(7)
+    for _ in range(10):
+        board = Board()
+        for _ in range(120):
+            moves = _legal_moves(board)
+            if not moves:
+                break
+            before = _state(board)
+            for move in moves:
+                undo = board.make_move(*move)
+                assert board.zobrist_key == board.compute_zobrist_key()
+                assert board.psq_score == board.compute_psq_score()
+                board.unmake_move(undo)
+                assert _state(board) == before
+            board.move_piece(*rng.choice(moves))
+
+
+def test_castling_and_en_passant_unmake():
+    board = Board()
+    for move in [((6, 4), (4, 4)), ((1, 0), (2, 0)), ((4, 4), (3, 4)), ((1, 3), (3, 3)),
+                 ((7, 6), (5, 5)), ((2, 0), (3, 0)), ((7, 5), (6, 4)), ((3, 0), (4, 0))]:
+        board.move_piece(*move)
+    before = _state(board)
+
+    undo = board.make_move((3, 4), (2, 3))  # exd6 e.p.
+    assert board.piece_at(3, 3) == 0 and board.piece_at(2, 3) == 1
+    board.unmake_move(undo)
+    assert _state(board) == before
+
+    board.move_piece((3, 4), (2, 4))
+    board.move_piece((1, 7), (2, 7))
+    before = _state(board)
+    undo = board.make_move((7, 4), (7, 6))  # O-O
+    assert board.piece_at(7, 6) == 6 and board.piece_at(7, 5) == 4
+    board.unmake_move(undo)
+    assert _state(board) == before
+
+
+def test_threefold_repetition_by_knight_shuffle():
+    board = Board()
+    shuffle = [((7, 6), (5, 5)), ((0, 6), (2, 5)), ((5, 5), (7, 6)), ((2, 5), (0, 6))]
+    for move in shuffle:
+        board.move_piece(*move)
+    assert not board.is_threefold_repetition()
+    for move in shuffle:
+        board.move_piece(*move)
+    assert board.is_threefold_repetition()
+
+    # a pawn move is irreversible: earlier positions can no longer count
+    board.move_piece((6, 0), (5, 0))
+    for move in shuffle:
+        board.move_piece(*move)
+    assert not board.is_threefold_repetition()
+
+
+def _empty_board():
+    # kings and rooks placed by hand must not be able to castle
+    board = Board()
+    board.squares = [[0] * 8 for _ in range(8)]
+    board.white_king_moved = True
+    board.black_king_moved = True
+    return board
+
+
+def test_en_passant_that_exposes_the_king_is_illegal():
+    board = _empty_board()
+    board.add_piece(-6, 4, 0)   # black Ka4
+    board.add_piece(1, 4, 3)    # white d4 (just pushed)
+    board.add_piece(-1, 4, 4)   # black e4
+    board.add_piece(4, 4, 7)    # white Rh4
+    board.add_piece(6, 7, 4)    # white Ke1
+    board.side_to_move = -1
+    board.en_passant_target = (5, 3)
+    moves = set(board.generate_legal_moves())
+    # both pawns leave the rank, exposing the black king to the rook
+    assert ((4, 4), (5, 3)) not in moves
+    assert moves == {((4, 0), to) for to in board.get_valid_moves(4, 0)} | {((4, 4), (5, 4))}
+
+
+def test_has_any_legal_moves_stalemate_and_mate():
+    board = _empty_board()
+    board.add_piece(-6, 0, 0)   # Ka8
+    board.add_piece(5, 2, 1)    # Qb6
+    board.add_piece(6, 7, 7)    # Kh1
+    board.side_to_move = -1
+    assert not board.has_any_legal_moves(-1)
+    assert not board.is_in_check(-1)
+
+    board.add_piece(0, 2, 1)
+    board.add_piece(5, 1, 1)    # Qb7, protected by the king
+    board.add_piece(6, 2, 2)    # Kc6
+    board.add_piece(0, 7, 7)
+    assert not board.has_any_legal_moves(-1)
+    assert board.is_in_check(-1)
+
+
+def test_copy_is_independent():
+    board = Board()
+    board.move_piece((6, 4), (4, 4))
+    before = _state(board)
+    clone = board.copy()
+    assert _state(clone) == before
+    clone.move_piece((1, 4), (3, 4))
+    clone.move_piece((7, 4), (6, 4))  # loses the castling rights on the clone only
+    assert _state(board) == before
+
+
+def test_fen_round_trip_follows_python_chess():
+    import chess
+    rng = random.Random(11)
+    board = Board()
+    reference = chess.Board()
+    assert board.to_fen() == reference.fen()
+    for _ in range(80):
+        moves = sorted(board.generate_legal_moves())
+        if not moves:
+            break
+        (fr, fc), (tr, tc) = rng.choice(moves)
+        uci = 'abcdefgh'[fc] + str(8 - fr) + 'abcdefgh'[tc] + str(8 - tr)
+        if board.piece_at(fr, fc) in (1, -1) and tr in (0, 7):
+            uci += 'q'
+        board.move_piece((fr, fc), (tr, tc))
+        reference.push_uci(uci)
+        # Board keeps the en passant square after every double push
+        fen = reference.fen(en_passant='fen')
+        assert board.to_fen() == fen
+        loaded = Board.from_fen(fen)
+        assert loaded.to_fen() == fen
+        assert loaded.zobrist_key == board.zobrist_key
+        assert loaded.psq_score == board.psq_score
+
+
+def test_from_fen_reads_epd_and_rejects_garbage():
+    board = Board.from_fen('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - bm Rxb5; id "p3";')
+    assert board.piece_at(3, 7) == -4 and board.side_to_move == 1
+    assert board.moves_since_capture_or_pawn == 0 and board.fullmove_number == 1
+    for fen in ['8/8/8 w - -', 'rnbqkbnr/ppppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+                'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1',
+                'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQxq - 0 1',
+                'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w K- - 0 1']:
+        try:
+            Board.from_fen(fen)
+        except ValueError:
+            continue
+        assert False, fen
+
+
+def test_move_from_an_empty_square_is_rejected():
+    board = Board()
+    before = _state(board)
+    for move in [((4, 4), (3, 4)), ((5, 0), (7, 0))]:
+        try:
+            board.move_piece(*move)
+        except ValueError:
+            continue
+        assert False, move
+    assert _state(board) == before
+
+
+def test_legal_move_cache_follows_the_position():
+    board = Board()
+    moves = board.legal_moves()
+    assert board.legal_moves() is moves
+    assert sorted(moves) == sorted(board.generate_legal_moves())
+    assert board.get_valid_moves(7, 6) == [(5, 5), (5, 7)]
+
+    board.move_piece((6, 5), (5, 5))
+    board.move_piece((1, 4), (3, 4))
+    board.move_piece((6, 6), (4, 6))
+    assert board.legal_moves() is not moves
+    assert not board.in_check()
+    undo = board.make_move((0, 3), (4, 7))  # Qh4#
+    assert board.in_check() and board.legal_moves() == ()
+    assert not board.has_any_legal_moves(1)
+    board.unmake_move(undo)
+    assert not board.in_check() and len(board.legal_moves()) == 30
+
+
+def test_king_square_and_piece_squares_follow_moves():
+    board = Board()
+    assert board.king_square(1) == 60 and board.king_square(-1) == 4
+    assert board.piece_squares(-1) == list(range(16))
+    board.move_piece((6, 4), (4, 4))
+    board.move_piece((1, 4), (3, 4))
+    board.move_piece((7, 6), (5, 5))
+    board.move_piece((0, 1), (2, 2))
+    board.move_piece((7, 5), (4, 2))
+    board.move_piece((0, 6), (2, 5))
+    undo = board.make_move((7, 4), (7, 6))  # O-O
+    assert board.king_square(1) == 62
+    assert board.piece_squares(1) == [34, 36, 45, 48, 49, 50, 51, 53, 54, 55, 56, 57, 58, 59, 61, 62]
+    board.unmake_move(undo)
+    assert board.king_square(1) == 60
+    assert Board.from_fen('8/8/8/8/8/8/8/K7 w - - 0 1').king_square(-1) is None
+
+
+def test_attack_map_counts_attackers_like_python_chess():
+    import chess
+
+    board = Board.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+    reference = chess.Board(board.to_fen())
+    for color, chess_color in ((1, chess.WHITE), (-1, chess.BLACK)):
+        attacks = board.attack_map(color)
+        for row in range(8):
+            for col in range(8):
+                square = chess.square(col, 7 - row)
+                assert attacks[row, col] == len(reference.attackers(chess_color, square)), (color, row, col)
+
+    attacks = board.attack_map(1)
+    assert board.attack_map(1) is attacks
+    undo = board.make_move((5, 5), (1, 5))  # Qxf7
+    assert board.attack_map(1) is not attacks and board.attack_map(1)[0, 4] == 1
+    board.unmake_move(undo)
+    assert (board.attack_map(1) == attacks).all()
+
+
+def test_snapshot_round_trip_is_compact_and_immutable():
+    import pickle
+
+    board = Board.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w Kq - 3 17')
+    board.move_piece((6, 0), (4, 0))  # a4, leaves an en passant square
+    position = board.snapshot()
+    restored = Board.from_snapshot(pickle.loads(pickle.dumps(position)))
+    # everything but the move history, which a snapshot leaves behind
+    assert _state(restored)[:9] == _state(board)[:9]
+    assert _state(restored)[10:] == _state(board)[10:]
+    assert restored.move_history == [position.key]
+    assert restored.to_fen() == board.to_fen()
+    assert restored.zobrist_key == restored.compute_zobrist_key()
+    assert sorted(restored.generate_legal_moves()) == sorted(board.generate_legal_moves())
+    assert len(pickle.dumps(position)) < len(pickle.dumps(board)) // 4
+
+    assert restored.snapshot() == position and hash(restored.snapshot()) == hash(position)
+    assert Board().snapshot() != position
+    try:
+        position.castling = 0
+    except AttributeError:
+        pass
+    else:
+        assert False, 'Position is immutable'
+
+
+def test_evaluate_batch_matches_psq_score():
+    import numpy as np
+    from evaluation import evaluate_batch
+
+    rng = random.Random(5)
+    board = Board()
+    boards = [board.copy()]
+    for _ in range(60):
+        moves = sorted(board.generate_legal_moves())
+        if not moves:
+            break
+        board.move_piece(*rng.choice(moves))
+        boards.append(board.copy())
+    scores = evaluate_batch(np.stack([b.squares for b in boards]))
+    assert scores.shape == (len(boards),)
+    assert scores.tolist() == [b.psq_score for b in boards]
+    assert evaluate_batch(np.zeros((0, 8, 8), dtype=np.int8)).shape == (0,)
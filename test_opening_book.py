@@ -0,0 +1,75 @@
+"""Opening book tests: Polyglot keys, book lookup and bot integration"""
+
+import os
+import random
+import struct
+import sys
+
+ROOT_DIR = os.path.dirname(__file__)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+import chess
+import chess.polyglot
+
+from board import Board
+from models.bot import AlphaBetaBot
+from models.opening_book import OpeningBook, polyglot_key
+
+
+def _raw_move(uci):
+    from_col, from_rank = 'abcdefgh'.index(uci[0]), int(uci[1]) - 1
+    to_col, to_rank = 'abcdefgh'.index(uci[2]), int(uci[3]) - 1
+    return to_col | to_rank << 3 | from_col << 6 | from_rank << 9
+
+
+def _write_book(path, entries):
+    # entries: (fen, uci, weight); Polyglot files are sorted by key
+    rows = sorted((chess.polyglot.zobrist_hash(chess.Board(fen)), _raw_move(uci), weight)
+                  for fen, uci, weight in entries)
+    with open(path, 'wb') as f:
+        for key, move, weight in rows:
+            f.write(struct.pack('>QHHI', key, move, weight, 0))
+
+
+def test_polyglot_key_matches_python_chess():
+    rng = random.Random(5)
+    for _ in range(5):
+        board = Board()
+        for _ in range(60):
+            reference = chess.Board(board.to_fen())
+            assert polyglot_key(board) == chess.polyglot.zobrist_hash(reference)
+            moves = sorted(board.generate_legal_moves())
+            if not moves:
+                break
+            board.move_piece(*rng.choice(moves))
+
+
+def test_book_lookup_and_bot_move(tmp_path):
+    start = chess.STARTING_FEN
+    after_e4 = 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1'
+    castle = 'r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1'
+    path = str(tmp_path / 'book.bin')
+    _write_book(path, [(start, 'e2e4', 3), (start, 'd2d4', 0), (start, 'g1f3', 1),
+                       (after_e4, 'e7e5', 1), (castle, 'e1h1', 1)])
+
+    book = OpeningBook(path)
+    assert sorted(book.find_moves(Board())) == [(((6, 3), (4, 3)), 0), (((6, 4), (4, 4)), 3),
+                                                (((7, 6), (5, 5)), 1)]
+    # castling is stored as the king taking its rook
+    assert book.find_moves(Board.from_fen(castle)) == [(((7, 4), (7, 6)), 1)]
+    assert book.find_moves(Board.from_fen('8/8/8/8/8/8/8/K6k w - - 0 1')) == []
+
+    # zero-weight moves are never chosen
+    picks = {book.choose_move(Board(), random.Random(seed)) for seed in range(20)}
+    assert picks == {((6, 4), (4, 4)), ((7, 6), (5, 5))}
+    book.close()
+
+    bot = AlphaBetaBot(color=-1, depth=3, book_path=path)
+    board = Board()
+    board.move_piece((6, 4), (4, 4))
+    assert bot.get_move(board) == ((1, 4), (3, 4))
+    assert bot.node_counts == []  # answered without searching
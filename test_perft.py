@@ -0,0 +1,34 @@
+"""Perft tests: move generation counted against known node totals"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(__file__)
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from board import Board
+from perft import POSITIONS, perft, perft_stats, divide
+
+
+def test_perft_matches_known_counts():
+    for name, (fen, expected) in POSITIONS.items():
+        board = Board.from_fen(fen)
+        for depth in (1, 2):
+            assert perft(board, depth) == expected[depth - 1], (name, depth)
+    assert perft(Board.from_fen(POSITIONS['position3'][0]), 4) == 43238
+
+
+def test_perft_stats_breakdown():
+    stats = perft_stats(Board.from_fen(POSITIONS['kiwipete'][0]), 2)
+    assert stats == {'nodes': 2039, 'captures': 351, 'en_passant': 1,
+                     'castles': 91, 'promotions': 0, 'checks': 3}
+
+
+def test_divide_sums_to_perft():
+    board = Board.from_fen(POSITIONS['position5'][0])
+    counts = divide(board, 2)
+    assert len(counts) == 41
+    assert sum(counts.values()) == 1373
+    assert board.zobrist_key == board.compute_zobrist_key()
@@ -0,0 +1,175 @@
+"""Search tests: transposition table, move ordering, alpha-beta consistency and time control"""
+
+import math
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(__file__)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from board import Board
+from models.bot import AlphaBetaBot
+from models.transposition import TranspositionTable, EXACT, LOWER
+from models.move_ordering import MoveOrderer
+from models.alphabeta_bot import choose_move
+
+
+def _middlegame_board():
+    board = Board()
+    for move in [((6, 4), (4, 4)), ((1, 4), (3, 4)), ((7, 6), (5, 5)), ((0, 1), (2, 2)),
+                 ((7, 5), (4, 2)), ((0, 6), (2, 5)), ((6, 3), (5, 3)), ((0, 5), (3, 2))]:
+        board.move_piece(*move)
+    return board
+
+
+def test_transposition_table_replacement():
+    tt = TranspositionTable(size_mb=0.001)
+    n = tt.num_buckets
+    tt.store(5, 4, EXACT, 10, None)
+    # shallower result for another key in the same bucket goes to the always-replace slot
+    tt.store(5 + n, 1, LOWER, 20, None)
+    assert tt.probe(5).depth == 4
+    assert tt.probe(5 + n).score == 20
+
+    # after a new search the old deep entry no longer protects its slot
+    tt.new_search()
+    tt.store(5 + 2 * n, 1, EXACT, 30, None)
+    assert tt.probe(5) is None
+    assert tt.probe(5 + 2 * n).score == 30
+
+
+def test_transposition_table_keeps_scores_exact():
+    board = _middlegame_board()
+    with_tt = AlphaBetaBot(color=1, depth=3)
+    with_tt.tt.new_search()
+    score, move = with_tt._alpha_beta(board, 3, -math.inf, math.inf)
+
+    without_tt = AlphaBetaBot(color=1, depth=3)
+    without_tt.tt.probe = lambda key: None
+    expected, _ = without_tt._alpha_beta(board, 3, -math.inf, math.inf)
+
+    assert score == expected
+    assert move is not None
+    # the root result is reused on the next call
+    assert with_tt.tt.probe(board.zobrist_key).move == move
+
+
+def test_iterative_deepening_respects_time_budget():
+    board = _middlegame_board()
+    bot = AlphaBetaBot(color=1, depth=20, move_time_ms=200)
+    start = time.perf_counter()
+    move = bot.get_move(board)
+    elapsed = time.perf_counter() - start
+
+    assert move in set(board.generate_legal_moves())
+    assert 1 <= bot.completed_depth < 20
+    assert elapsed < 2.0
+
+
+def test_move_ordering_bands():
+    board = Board()
+    for move in [((6, 4), (4, 4)), ((1, 3), (3, 3)), ((7, 3), (3, 7)), ((0, 1), (2, 2))]:
+        board.move_piece(*move)
+    # White can take a pawn with exd5, Qxd5, Qxf7+ and Qxh7
+    orderer = MoveOrderer(AlphaBetaBot.PIECE_VALUES)
+    moves = list(board.generate_legal_moves())
+    killer = ((7, 6), (5, 5))
+    hash_move = ((6, 0), (5, 0))
+    orderer.record_cutoff(board, killer, depth=3, ply=2)
+
+    ordered = orderer.order(board, moves, ply=2, hash_move=hash_move)
+    assert ordered[0] == hash_move
+    captures = [m for m in ordered[1:] if board.piece_at(*m[1]) != 0]
+    assert ordered[1:1 + len(captures)] == captures
+    # equal victims: the pawn capture comes before the queen capture
+    assert captures[0] == ((4, 4), (3, 3))
+    assert ordered[1 + len(captures)] == killer
+    assert sorted(ordered) == sorted(moves)
+
+
+def test_node_counts_per_ply():
+    bot = AlphaBetaBot(color=1, depth=3)
+    bot.get_move(_middlegame_board())
+    assert len(bot.node_counts) > 4  # quiescence plies extend past the nominal depth
+    assert bot.node_counts[0] == 3  # one root visit per iteration
+
+
+def test_quiescence_sees_the_recapture():
+    board = Board()
+    for move in [((6, 4), (4, 4)), ((1, 4), (3, 4)), ((7, 3), (3, 7)), ((0, 1), (2, 2))]:
+        board.move_piece(*move)
+    # Qxe5+, Qxf7+ and Qxh7 all win a pawn and lose the queen
+    losing = {((3, 7), (3, 4)), ((3, 7), (1, 5)), ((3, 7), (1, 7))}
+    bot = AlphaBetaBot(color=1, depth=1)
+    assert bot.get_move(board) not in losing
+    assert choose_move(board, 1, depth=1) not in losing
+
+
+def test_parallel_root_search_matches_serial():
+    board = _middlegame_board()
+    serial = AlphaBetaBot(color=1, depth=3)
+    parallel = AlphaBetaBot(color=1, depth=3, workers=2)
+    try:
+        assert parallel.get_move(board) == serial.get_move(board)
+        assert parallel.node_counts[0] == 3
+        assert len(parallel.node_counts) > 3  # worker nodes are merged in
+    finally:
+        parallel.close()
+
+
+def test_shorter_mate_scores_higher():
+    # Rh8 mates at once; most other rook moves still mate a move later
+    board = Board.from_fen('k7/8/1K6/8/8/8/8/7R w - - 0 1')
+    bot = AlphaBetaBot(color=1, depth=3, book_path=None)
+    score, move = bot._alpha_beta(board, 3, -math.inf, math.inf)
+    assert move == ((7, 7), (0, 7))
+    assert score == AlphaBetaBot.MATE_SCORE - 1
+    # the same search again, now answered partly from the table
+    assert bot._alpha_beta(board, 3, -math.inf, math.inf) == (score, move)
+
+    # the losing side sees the mate coming at the same distance
+    defender = AlphaBetaBot(color=-1, depth=3, book_path=None)
+    assert defender._alpha_beta(board, 3, -math.inf, math.inf)[0] == -score
+
+
+def test_stop_before_the_search_starts_is_kept():
+    bot = AlphaBetaBot(color=1, depth=6, book_path=None)
+    board = _middlegame_board()
+    bot.clear_stop()
+    bot.stop()  # e.g. a cancel between starting the search thread and get_move
+    start = time.perf_counter()
+    assert bot.get_move(board) is None
+    assert time.perf_counter() - start < 0.5
+    # the stop only applied to that one search
+    bot.depth = 2
+    assert bot.get_move(board) is not None
+
+
+def test_worker_bots_keep_the_caller_settings():
+    from models import bot as bot_module
+
+    caller = AlphaBetaBot(color=1, depth=2, tt_size_mb=1, book_path=None)
+    board = _middlegame_board()
+    move = next(board.generate_legal_moves())
+    bot_module._search_root_move(AlphaBetaBot, 1, caller._worker_kwargs, 1, board.snapshot(),
+                                 move, 1, -math.inf, math.inf, None)
+    key = (AlphaBetaBot, 1, tuple(sorted(caller._worker_kwargs.items())))
+    worker, _ = bot_module._worker_bots[key]
+    assert worker.tt.num_buckets == caller.tt.num_buckets
+    assert worker.book is None
+
+
+def test_style_bots_read_the_attack_map():
+    from models.bot import AggressiveBot, CautiousBot
+
+    # white queen on h5 eyes f7 and e8's neighbourhood; black has nothing near white's king
+    board = Board.from_fen('rnbqkbnr/pppp1ppp/8/4p2Q/4P3/8/PPPP1PPP/RNB1KBNR b KQkq - 1 2')
+    assert AggressiveBot(color=1)._count_attacked_pieces(board) == 3   # e5, f7, h7
+    assert AggressiveBot(color=-1)._count_attacked_pieces(board) == 0
+    assert CautiousBot(color=-1)._evaluate_king_safety(board) < 0
+    assert CautiousBot(color=1)._evaluate_king_safety(board) == -CautiousBot(color=-1)._evaluate_king_safety(board)
@@ -0,0 +1,72 @@
+"""Tablebase tests: root moves, probe caching and use in the search"""
+
+import math
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(__file__)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from board import Board
+from models.bot import AlphaBetaBot
+from models.tablebase import Tablebase, get_tablebase
+
+
+class _QueenWinsTablebase(Tablebase):
+    """Stand-in tables for three-piece endings: whoever has the queen wins."""
+
+    def _probe_wdl_tables(self, board):
+        queen = 1 if board.piece_count(5) else -1 if board.piece_count(-5) else 0
+        if queen == 0:
+            return 0
+        return 2 if board.side_to_move == queen else -2
+
+    def _probe_dtz_tables(self, board):
+        self.dtz_probes += 1
+        wdl = self._probe_wdl_tables(board)
+        return 0 if wdl == 0 else (1 if wdl > 0 else -1)
+
+
+def _tables(tmp_path):
+    tablebase = _QueenWinsTablebase(str(tmp_path))
+    tablebase.max_pieces = 3
+    tablebase.dtz_probes = 0
+    return tablebase
+
+
+def test_missing_tables_disable_probing(tmp_path):
+    assert get_tablebase(None) is None
+    assert get_tablebase(str(tmp_path)) is None
+    assert AlphaBetaBot(color=1, tablebase_path=str(tmp_path)).tablebase is None
+
+
+def test_root_move_keeps_the_best_result(tmp_path):
+    tablebase = _tables(tmp_path)
+    board = Board.from_fen('k7/8/8/8/8/8/1q6/K7 w - - 0 1')
+    # taking the hanging queen is the only move that does not lose
+    assert tablebase.best_move(board) == ((7, 0), (6, 1))
+    assert tablebase.probe_wdl(Board()) is None  # too many pieces
+
+    # the second call is answered from the cache
+    probes = tablebase.probes
+    assert tablebase.best_move(board) == ((7, 0), (6, 1))
+    assert tablebase.probes == probes and tablebase.hits == probes
+
+
+def test_search_uses_tablebase_scores(tmp_path):
+    bot = AlphaBetaBot(color=1, depth=3)
+    bot.tablebase = _tables(tmp_path)
+    board = Board.from_fen('k7/8/8/8/8/8/1q6/K7 w - - 0 1')
+    score, move = bot._alpha_beta(board, 3, -math.inf, math.inf)
+    assert (score, move) == (0, ((7, 0), (6, 1)))
+    assert bot.tablebase.probes == 1 and bot.tablebase.dtz_probes == 0
+
+    board = Board.from_fen('k7/8/8/8/8/8/1Q6/K7 b - - 0 1')
+    bot = AlphaBetaBot(color=1, depth=2)
+    bot.tablebase = _tables(tmp_path)
+    score, _ = bot._alpha_beta(board, 2, -math.inf, math.inf)
+    assert score == AlphaBetaBot.TABLEBASE_WIN
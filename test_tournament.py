@@ -0,0 +1,45 @@
+"""Headless tournament tests: game adjudication and PGN output"""
+
+import io
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(__file__)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+import chess.pgn
+
+from tournament import play_game, build_pgn, run_tournament
+
+
+def test_play_game_is_reproducible_and_exports_pgn():
+    first = play_game(('alphabeta', 1), ('random', 1), opening_plies=4, seed=3)
+    second = play_game(('alphabeta', 1), ('random', 1), opening_plies=4, seed=3)
+    assert first == second
+    assert first['result'] in ('1-0', '0-1', '1/2-1/2')
+
+    pgn = build_pgn(first['moves'], 'A', 'B', first['result'], first['termination'])
+    game = chess.pgn.read_game(io.StringIO(pgn))
+    assert len(list(game.mainline_moves())) == first['plies']
+
+
+def test_move_limit_adjudicates_a_draw():
+    game = play_game(('random', 1), ('random', 1), seed=1, max_plies=6, win_plies=0)
+    assert game == dict(game, result='1/2-1/2', termination='adjudicated on move limit', plies=6)
+
+
+def test_tournament_streams_results(tmp_path):
+    pgn_path = tmp_path / 'match.pgn'
+    results_path = tmp_path / 'match.jsonl'
+    games = list(run_tournament(('random', 1), ('random', 1), 2, workers=2, seed=5,
+                                pgn_path=str(pgn_path), results_path=str(results_path),
+                                max_plies=20))
+    assert sorted(g['index'] for g in games) == [0, 1]
+    # both games of a pair start from the same opening with colors swapped
+    assert games[0]['moves'][:4] == games[1]['moves'][:4]
+    assert len(results_path.read_text().splitlines()) == 2
+    assert pgn_path.read_text().count('[Event ') == 2